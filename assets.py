@@ -0,0 +1,164 @@
+"""Background asset loading from a manifest
+
+The game lists its assets in a manifest and an AssetManager loads and
+decodes them on a worker thread, so the menu is on screen straight away
+however many assets there are. Required assets are loaded first and a
+round waits briefly for them; optional ones are used once they are ready
+and simply left out if they fail to load.
+
+Sound files are decoded once per content hash, so identical files share
+one Sound. With a cache directory the decoded PCM is also kept on disk
+under that hash (and the mixer format), and later runs skip decoding.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import namedtuple
+
+import pygame
+
+from sound_bank import EFFECTS, SoundBank
+from startup import StartupProfiler
+
+# kind is "effect" (source is a SoundBank effect name) or "sound" (source is a file path)
+Asset = namedtuple("Asset", ["name", "kind", "source", "required"])
+
+REQUIRED_WAIT = 0.5  # Seconds a round start waits for required assets
+
+# Optional extras from the web version: name -> file in its sounds directory
+EXTRAS = {
+    "game_over": "game_over.wav",
+    "music1": "music1.wav",
+    "music2": "music2.wav",
+    "music3": "music3.wav",
+}
+
+
+def game_manifest(sound_dir, extras_dir, sound_files=False):
+    """The desktop game's assets: its effects, then the optional extras"""
+    if sound_files:
+        manifest = [Asset(name, "sound", os.path.join(sound_dir, f"{name}.wav"), True)
+                    for name in EFFECTS]
+    else:
+        manifest = [Asset(name, "effect", name, True) for name in EFFECTS]
+    manifest += [Asset(name, "sound", os.path.join(extras_dir, filename), False)
+                 for name, filename in EXTRAS.items()]
+    return manifest
+
+
+def content_hash(data):
+    """Hash of a file's bytes and the mixer format they are decoded to"""
+    digest = hashlib.sha256(data)
+    digest.update(repr(pygame.mixer.get_init()).encode())
+    return digest.hexdigest()[:16]
+
+
+class AssetManager:
+    """Loads a manifest's assets on a worker thread and reports progress"""
+
+    def __init__(self, manifest, cache_dir=None, prepare=None, startup=None):
+        self.manifest = sorted(manifest, key=lambda asset: not asset.required)  # Required first
+        self.cache_dir = cache_dir
+        self.prepare = prepare  # Called on the worker before loading, e.g. to write missing files
+        self.startup = startup or StartupProfiler()
+        self.loaded = {}  # Name -> loaded asset, filled in by the worker
+        self.failed = []  # Names of optional assets that could not be loaded
+        self.decoded = {}  # Content hash -> Sound
+        self.done = 0  # Manifest entries finished, loaded or not
+        self.required_ready = threading.Event()
+        self.finished = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.load_all, daemon=True)
+        self.thread.start()
+
+    def progress(self):
+        """(entries finished, total entries)"""
+        return self.done, len(self.manifest)
+
+    def wait_required(self, timeout=REQUIRED_WAIT):
+        """Wait up to timeout for the required assets; returns True if they are in"""
+        return self.required_ready.wait(timeout)
+
+    def wait(self, timeout=None):
+        """Wait for the whole manifest"""
+        return self.finished.wait(timeout)
+
+    def stop(self):
+        """Stop after the asset being loaded now and wait for the worker
+
+        Call before shutting pygame down, so the mixer is not torn down
+        under a decode.
+        """
+        self.stopping.set()
+        self.finished.wait()
+
+    def load_all(self):
+        try:
+            self.load_manifest()
+        finally:
+            # Never leave a waiting game hanging, even if loading broke off
+            self.required_ready.set()
+            self.finished.set()
+
+    def load_manifest(self):
+        try:
+            with self.startup.phase("audio"):
+                pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Warning: Could not start audio: {e}")
+            self.done = len(self.manifest)
+            return
+
+        with self.startup.phase("assets"):
+            if self.prepare:
+                self.prepare()
+            bank = SoundBank(cache_dir=self.cache_dir)
+            for asset in self.manifest:
+                if self.stopping.is_set():
+                    break
+                if not asset.required:
+                    self.required_ready.set()
+                try:
+                    self.loaded[asset.name] = self.load(asset, bank)
+                except (pygame.error, OSError) as e:
+                    if asset.required:
+                        print(f"Warning: Could not load {asset.name}: {e}")
+                    else:
+                        self.failed.append(asset.name)
+                self.done += 1
+
+    def load(self, asset, bank):
+        if asset.kind == "effect":
+            return bank.load(asset.source)
+        return self.load_sound(asset.source)
+
+    def load_sound(self, path):
+        """Decode a sound file, reusing an earlier decode of the same content"""
+        with open(path, "rb") as f:
+            data = f.read()
+        key = content_hash(data)
+        sound = self.decoded.get(key)
+        if sound is not None:
+            return sound
+
+        raw_path = self.cache_dir and os.path.join(self.cache_dir, f"decoded-{key}.pcm")
+        if raw_path and os.path.exists(raw_path):
+            with open(raw_path, "rb") as f:
+                sound = pygame.mixer.Sound(buffer=f.read())
+        else:
+            sound = pygame.mixer.Sound(file=io.BytesIO(data))
+            if raw_path:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    # Write under a temporary name so a partial file never matches
+                    with open(raw_path + ".tmp", "wb") as f:
+                        f.write(sound.get_raw())
+                    os.replace(raw_path + ".tmp", raw_path)
+                except OSError:
+                    pass  # Read-only or unavailable cache; decoding again is fine
+        self.decoded[key] = sound
+        return sound
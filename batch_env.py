@@ -0,0 +1,159 @@
+"""Batched environment stepping many independent games with NumPy
+
+Every game in the batch follows the Simulation rules (spawn timing, the
+DIFFICULTY settings, the swept basket test, scoring and misses) but the
+state of all of them lives in (games, slots) arrays, so one step is a
+fixed number of vector operations whatever the batch size.
+
+Spawns draw from a NumPy generator rather than Python's random module, so
+a game here does not replay the same objects as a Simulation with the same
+seed; the rules and score distributions are the same.
+
+    env = BatchEnv(1024, "Hard", seed=0)
+    obs = env.reset()
+    while not env.done.all():
+        obs, reward, done = env.step(policy(obs))
+
+step() returns the same preallocated arrays every time; copy them if they
+are needed after the next step.
+"""
+import math
+
+import numpy as np
+
+from simulation import Simulation
+
+OBS_OBJECTS = 4  # Objects per game in the observation, lowest first
+
+
+class BatchEnv:
+    """N games stepped together; actions are basket x positions"""
+
+    WIDTH, HEIGHT = Simulation.WIDTH, Simulation.HEIGHT
+    GAME_DURATION = Simulation.GAME_DURATION
+    GOOD_CHANCE = Simulation.GOOD_CHANCE
+    DIFFICULTY = Simulation.DIFFICULTY
+    SPAWN_Y = Simulation.SPAWN_Y
+    BASKET_WIDTH = Simulation.BASKET_WIDTH
+    BASKET_Y = Simulation.BASKET_Y
+
+    def __init__(self, num_games, difficulty="Medium", seed=None, timestep=1 / 60,
+                 obs_objects=OBS_OBJECTS):
+        self.num_games = num_games
+        self.timestep = timestep
+        self.rng = np.random.default_rng(seed)
+
+        # Per-game difficulty settings
+        if isinstance(difficulty, str):
+            difficulty = [difficulty] * num_games
+        settings = [self.DIFFICULTY[name] for name in difficulty]
+        self.spawn_rate = np.array([s["spawn_rate"] for s in settings])
+        self.speed_min = np.array([s["speed_range"][0] for s in settings])
+        self.speed_max = np.array([s["speed_range"][1] for s in settings])
+        self.good_chance = np.full(num_games, self.GOOD_CHANCE)
+
+        # Enough slots for every object that can be on screen at once
+        fall_time = (self.HEIGHT - self.SPAWN_Y) / self.speed_min.min()
+        self.slots = math.ceil(fall_time / self.spawn_rate.min()) + 2
+
+        shape = (num_games, self.slots)
+        self.x = np.zeros(shape)
+        self.y = np.zeros(shape)
+        self.speed = np.zeros(shape)
+        self.bad = np.zeros(shape, dtype=bool)
+        self.active = np.zeros(shape, dtype=bool)
+
+        self.time = np.zeros(num_games)
+        self.last_spawn_time = np.zeros(num_games)
+        self.basket_x = np.full(num_games, float(self.WIDTH // 2))
+        self.score = np.zeros(num_games, dtype=np.int64)
+        self.misses = np.zeros(num_games, dtype=np.int64)
+
+        # Step results, overwritten in place every step
+        self.obs_objects = obs_objects
+        self.obs = np.zeros((num_games, 2 + 3 * obs_objects), dtype=np.float32)
+        self.reward = np.zeros(num_games, dtype=np.int64)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.rows = np.arange(num_games)[:, None]
+
+    def reset(self, games=None):
+        """Start new rounds for the given games (all by default); returns obs"""
+        if games is None:
+            games = slice(None)
+        self.active[games] = False
+        self.time[games] = 0.0
+        self.last_spawn_time[games] = 0.0
+        self.basket_x[games] = self.WIDTH // 2
+        self.score[games] = 0
+        self.misses[games] = 0
+        self.reward[games] = 0
+        self.done[games] = False
+        self.observe()
+        return self.obs
+
+    def step(self, basket_x):
+        """Advance every running game one tick; returns (obs, reward, done)"""
+        dt = self.timestep
+        running = ~self.done
+        self.time[running] += dt
+        self.done |= self.time >= self.GAME_DURATION
+        running = ~self.done
+        self.basket_x[running] = np.broadcast_to(basket_x, self.num_games)[running]
+
+        self.spawn(running & (self.time - self.last_spawn_time > self.spawn_rate))
+
+        # Integration, swept basket test and off-screen test for live objects
+        live = self.active & running[:, None]
+        y = self.y
+        y += np.where(live, self.speed * dt, 0.0)
+        half = self.BASKET_WIDTH // 2
+        bx = self.basket_x[:, None]
+        caught = (live & (y >= self.BASKET_Y - 10) & (y - self.speed * dt <= self.BASKET_Y + 10) &
+                  (self.x >= bx - half) & (self.x <= bx + half))
+        missed = live & ~caught & (y > self.HEIGHT)
+        self.active &= ~(caught | missed)
+
+        caught_bad = np.count_nonzero(caught & self.bad, axis=1)
+        caught_good = np.count_nonzero(caught, axis=1) - caught_bad
+        np.subtract(10 * caught_good, 5 * caught_bad, out=self.reward)
+        self.score += self.reward
+        self.misses += np.count_nonzero(missed & ~self.bad, axis=1)
+
+        self.observe()
+        return self.obs, self.reward, self.done
+
+    def spawn(self, games):
+        """Put one new object into a free slot of each given game"""
+        index = np.flatnonzero(games)
+        if not len(index):
+            return
+        slot = np.argmin(self.active[index], axis=1)  # First free slot
+        if self.active[index, slot].any():
+            raise RuntimeError("object slots exhausted")
+        k = len(index)
+        self.x[index, slot] = self.rng.integers(50, self.WIDTH - 50, k, endpoint=True)
+        self.y[index, slot] = self.SPAWN_Y
+        self.speed[index, slot] = self.rng.integers(self.speed_min[index], self.speed_max[index],
+                                                    endpoint=True)
+        self.bad[index, slot] = self.rng.random(k) >= self.good_chance[index]
+        self.active[index, slot] = True
+        self.last_spawn_time[index] = self.time[index]
+
+    def observe(self):
+        """Fill obs: basket x, time left, then the lowest objects' x, y and badness
+
+        Positions are scaled to 0..1 by the screen size; unused object
+        entries are zero.
+        """
+        obs = self.obs
+        obs[:, 0] = self.basket_x / self.WIDTH
+        obs[:, 1] = np.maximum(0.0, self.GAME_DURATION - self.time) / self.GAME_DURATION
+
+        m = min(self.obs_objects, self.slots)
+        # Lowest objects first; free slots sort last
+        order = np.argsort(np.where(self.active, -self.y, np.inf), axis=1)[:, :m]
+        active = self.active[self.rows, order]
+        objects = obs[:, 2:2 + 3 * m].reshape(self.num_games, m, 3)
+        objects[..., 0] = np.where(active, self.x[self.rows, order] / self.WIDTH, 0.0)
+        objects[..., 1] = np.where(active, self.y[self.rows, order] / self.HEIGHT, 0.0)
+        objects[..., 2] = np.where(active, self.bad[self.rows, order], 0.0)
@@ -0,0 +1,44 @@
+"""Check that steady-state simulation allocates no falling objects
+
+Plays a Hard round headless, then reports how many FallingObjects the
+pool had to create and how many garbage collections ran after warm-up.
+
+Run from the repository root:
+
+    python benchmarks/bench_allocations.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiler import GCCounter
+from simulation import Simulation
+
+WARMUP_TICKS = 600  # Ten seconds to fill the screen and the pool
+
+
+def main():
+    sim = Simulation("Hard", seed=1)
+    policy = lambda sim: sim.WIDTH // 2
+
+    for _ in range(WARMUP_TICKS):
+        sim.step(policy(sim))
+
+    allocated = sim.pool.allocated
+    reused = sim.pool.reused
+    counter = GCCounter().install()
+    ticks = 0
+    while not sim.game_over:
+        sim.step(policy(sim))
+        ticks += 1
+    counter.uninstall()
+
+    print(f"warm-up: {allocated} objects allocated")
+    print(f"steady state: {ticks} ticks, {sim.pool.allocated - allocated} objects allocated, "
+          f"{sim.pool.reused - reused} reused from the pool")
+    print(f"garbage collections: {counter.collections} (gen0, gen1, gen2)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare CatchGame.update frame time for the list, array and scheduled object stores
+
+Run from the repository root:
+
+    python benchmarks/bench_object_store.py
+"""
+import os
+import sys
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catch_falling_objects import CatchGame, FallingObject
+
+SIZES = [100, 10000, 100000]
+
+
+def populate(game, n, seed=0):
+    """Fill the game with n objects spread over the screen"""
+    rng = random.Random(seed)
+    game.reset_game()
+    game.sim.spawn_rate = float("inf")  # Keep the population fixed
+    for _ in range(n):
+        obj = FallingObject(rng.randint(50, game.WIDTH - 50),
+                            rng.uniform(-20, game.HEIGHT),
+                            rng.randint(150, 250),
+                            0 if rng.random() < 0.7 else 1)
+        game.objects.append(obj)
+
+
+def time_updates(game, n, frames):
+    """Return mean milliseconds per update over the given number of frames"""
+    populate(game, n)
+    game.update(1 / 60)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.update(1 / 60)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main():
+    list_game = CatchGame()
+    array_game = CatchGame(use_array_store=True)
+    scheduled_game = CatchGame(use_scheduler=True)
+    if not array_game.sim.use_array_store:
+        sys.exit("NumPy is required for the array store benchmark")
+    for game in (list_game, array_game, scheduled_game):
+        game.wait_for_audio()
+        game.sounds = {}  # Keep the mixer out of the numbers
+
+    print(f"{'objects':>8} {'list ms':>10} {'array ms':>10} {'speedup':>8} {'sched ms':>10} {'speedup':>8}")
+    for n in SIZES:
+        frames = max(3, min(200, 200000 // n))
+        list_ms = time_updates(list_game, n, frames)
+        array_ms = time_updates(array_game, n, frames)
+        scheduled_ms = time_updates(scheduled_game, n, frames)
+        print(f"{n:>8} {list_ms:>10.3f} {array_ms:>10.3f} {list_ms / array_ms:>7.1f}x "
+              f"{scheduled_ms:>10.3f} {list_ms / scheduled_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
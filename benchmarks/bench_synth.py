@@ -0,0 +1,93 @@
+"""Time generation of the shipped sound asset set: per-sample loops vs synth
+
+Run from the repository root:
+
+    python benchmarks/bench_synth.py
+"""
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web_game", "sounds"))
+
+import synth
+from generate_sounds import EFFECTS, MUSIC, generate_all
+
+
+def legacy_tone(filename, frequency, duration, volume):
+    """The original per-sample struct.pack sine generator"""
+    sample_rate = 44100
+    buf = []
+    for i in range(int(duration * sample_rate)):
+        sample = int(32767.0 * volume * math.sin(2 * math.pi * frequency * i / sample_rate))
+        buf.append(struct.pack('h', sample))
+    write_frames(filename, b''.join(buf))
+
+
+def legacy_music(filename, duration, notes, notes_per_second, bass_frequency, bass_rate,
+                 bass_steps, octave_drop_rate=None):
+    """The original per-sample music generator"""
+    sample_rate = 44100
+    audio_data = []
+    for i in range(int(duration * sample_rate)):
+        t = i / sample_rate
+        freq = notes[int((t * notes_per_second) % len(notes))]
+        if octave_drop_rate and int(t * octave_drop_rate) % 4 == 0:
+            freq *= 0.5
+        sample = int(10000 * math.sin(2 * math.pi * freq * t))
+        bass_freq = bass_frequency * (1 + int(t * bass_rate) % bass_steps)
+        sample += int(5000 * math.sin(2 * math.pi * bass_freq * t))
+        envelope = min(1.0, (duration - t) / 2.0, t / 2.0)
+        audio_data.append(struct.pack('h', int(sample * envelope)))
+    write_frames(filename, b''.join(audio_data))
+
+
+def write_frames(filename, frames):
+    with wave.open(filename, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(44100)
+        wf.writeframes(frames)
+
+
+def legacy_generate_all(sound_dir, duration=10.0):
+    for name, (frequency, length, volume) in EFFECTS.items():
+        legacy_tone(os.path.join(sound_dir, name + ".wav"), frequency, length, volume)
+    for name, track in MUSIC.items():
+        melody, bass = track["melody"], track["bass"]
+        legacy_music(os.path.join(sound_dir, name + ".wav"), duration, melody["notes"],
+                     melody["notes_per_second"], bass["frequency"], bass["steps_per_second"],
+                     bass["steps"], melody.get("octave_drop_rate"))
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as synth_dir:
+        legacy = best_of(lambda: legacy_generate_all(legacy_dir), 3)
+        fast = best_of(lambda: generate_all(synth_dir), 5)
+
+        identical = all(
+            open(os.path.join(legacy_dir, name), "rb").read() == open(os.path.join(synth_dir, name), "rb").read()
+            for name in os.listdir(legacy_dir))
+
+    backend = "numpy" if synth.np is not None else "array"
+    print(f"per-sample loops: {legacy * 1000:8.1f} ms")
+    print(f"synth ({backend}):   {fast * 1000:8.1f} ms  ({legacy / fast:.1f}x faster)")
+    print(f"identical output: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Headless benchmark suite for the update and render hot paths
+
+Drives every screen with synthetic object populations under the SDL dummy
+drivers and reports ms/frame for update and render separately. Results can
+be saved as JSON and compared against a stored baseline; the run fails
+when any case got slower than the threshold allows.
+
+Run from the repository root:
+
+    python benchmarks/suite.py --save baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from bench_object_store import populate
+from catch_falling_objects import CatchGame
+
+DT = 1 / 60
+
+
+def make_games():
+    """One game per object container, without sound"""
+    games = {"list": CatchGame(), "scheduler": CatchGame(use_scheduler=True)}
+    array_game = CatchGame(use_array_store=True)
+    if array_game.sim.use_array_store:
+        games["array"] = array_game
+    for game in games.values():
+        game.wait_for_audio()
+        game.sounds = {}
+    return games
+
+
+def cases(games, sizes):
+    """Yield (name, setup, frame) for every benchmark case
+
+    setup() prepares a fresh state before each repetition and frame()
+    does one frame's worth of the work being measured.
+    """
+    for store, game in games.items():
+        for n in sizes:
+            yield (f"update/{store}/{n}", lambda game=game, n=n: populate(game, n),
+                   lambda game=game: game.update(DT))
+
+    game = games["list"]
+    for n in sizes:
+        def setup_playing(n=n, dirty=False):
+            populate(game, n)
+            game.dirty_rects = dirty
+            game.drawn_state = None
+            game.game_state = "playing"
+
+        def draw_playing():
+            game.draw_playing()
+            game.drawn_state = "playing"
+
+        yield f"render/playing/{n}", setup_playing, draw_playing
+        yield f"render/playing-dirty/{n}", lambda n=n: setup_playing(n, dirty=True), draw_playing
+        yield (f"render/object-draw/{n}", lambda n=n: populate(game, n),
+               lambda: [obj.draw(game.screen) for obj in game.objects])
+
+    yield "render/hud", lambda: game.hud.clear(), lambda: game.draw_game_ui()
+    yield "render/menu", lambda: None, lambda: game.show_menu()
+
+    def setup_menu_idle():
+        game.drawn_state = None
+        game.show_menu()
+        game.drawn_state = "menu"
+
+    yield "render/menu-idle", setup_menu_idle, lambda: game.show_menu()
+    yield "render/game_over", lambda: None, lambda: game.show_game_over()
+
+
+def measure(setup, frame, frames, repeat, warmup):
+    """Median and best ms/frame over the repetitions"""
+    timings = []
+    for _ in range(repeat):
+        setup()
+        for _ in range(warmup):
+            frame()
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame()
+        timings.append((time.perf_counter() - start) * 1000 / frames)
+    return {"ms_per_frame": statistics.median(timings), "best": min(timings), "reps": timings}
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline; return the regressed case names"""
+    regressions = []
+    print(f"{'case':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["ms_per_frame"]
+        after = result["ms_per_frame"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32} {before:>10.4f} {after:>10.4f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark update and render hot paths headless")
+    parser.add_argument("--sizes", default="10,100,1000,10000",
+                        help="comma separated object counts")
+    parser.add_argument("--frames", type=int, default=50, help="timed frames per repetition")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=5, help="untimed frames per repetition")
+    parser.add_argument("--filter", default="", help="only run cases containing this text")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown against the baseline (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.sizes.split(",")]
+    games = make_games()
+
+    results = {}
+    for name, setup, frame in cases(games, sizes):
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup, frame, args.frames, args.repeat, args.warmup)
+        if not args.baseline:
+            print(f"{name:<32} {results[name]['ms_per_frame']:>10.4f} ms/frame")
+
+    if args.save:
+        meta = {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "repeat": args.repeat,
+        }
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Frame capture with encoding on background threads
+
+Each captured frame is copied once, straight from a pygame.surfarray view
+of the screen into a preallocated NumPy buffer, and handed to a thread pool
+for encoding. There are only as many buffers as the queue allows: when all
+of them are waiting to be encoded a live game drops the frame rather than
+wait, while headless rendering waits so no frame is lost.
+
+The output format follows the path:
+
+    clip/          directory of numbered PNGs
+    clip.gif       animated GIF (needs Pillow)
+    clip.rgb       raw rgb24 frames for an external encoder, e.g.
+                   ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 60 -i clip.rgb clip.mp4
+
+PNGs are encoded with zlib, which releases the GIL, so several frames
+compress in parallel without holding up the game loop. GIF frames are
+appended to the file as soon as they and every frame before them are
+encoded, so memory use does not grow with the length of the clip.
+"""
+import io
+import os
+import queue
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only capture needs it
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; only GIF export needs it
+    Image = None
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# GIF delays are in hundredths of a second and viewers stretch anything under
+# two, so faster clips would play back slowed down
+GIF_MAX_FPS = 50
+
+
+def png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def png_bytes(scanlines, width, height, level=3):
+    """Encode (height, 1 + width * 3) RGB scanlines, each starting with filter byte 0"""
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (PNG_SIGNATURE + png_chunk(b"IHDR", header) +
+            png_chunk(b"IDAT", zlib.compress(scanlines, level)) + png_chunk(b"IEND", b""))
+
+
+def gif_header(width, height):
+    """GIF89a header with no global palette, looping forever"""
+    return (b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0) +
+            b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+
+def gif_frame(image, delay):
+    """One frame's graphic control extension and image block
+
+    Pillow encodes the frame as a whole single-image GIF; its palette moves
+    from the global table to a local one so frames can be appended.
+    """
+    out = io.BytesIO()
+    image.save(out, "GIF")
+    data = out.getvalue()
+    packed = data[10]
+    position = 13
+    palette = b""
+    if packed & 0x80:
+        position += 3 << ((packed & 7) + 1)
+        palette = data[13:position]
+    while data[position] == 0x21:  # Skip extensions up to the image descriptor
+        position += 2
+        while data[position]:
+            position += data[position] + 1
+        position += 1
+    descriptor = bytearray(data[position:position + 10])
+    if palette:
+        descriptor[9] = (descriptor[9] & 0x40) | 0x80 | (packed & 7)
+    control = b"\x21\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00"
+    return control + bytes(descriptor) + palette + data[position + 10:-1]  # Drop the trailer
+
+
+def check_output(path):
+    """Raise RuntimeError if a capture to path cannot work here"""
+    if np is None:
+        raise RuntimeError("frame capture needs NumPy (pip install numpy)")
+    if output_format(path) == "gif" and Image is None:
+        raise RuntimeError("GIF export needs Pillow (pip install pillow)")
+
+
+def max_fps(path):
+    """Highest frame rate the output format plays back correctly, or None"""
+    return GIF_MAX_FPS if output_format(path) == "gif" else None
+
+
+def output_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gif":
+        return "gif"
+    if extension in (".rgb", ".raw"):
+        return "raw"
+    return "png"
+
+
+class FrameCapture:
+    """Copies screen frames into pooled buffers and encodes them on threads"""
+
+    def __init__(self, path, size, fps=60, block=False, queue_size=8, workers=2):
+        self.path = path
+        self.format = output_format(path)
+        self.width, self.height = size
+        self.source_fps = fps  # Rate capture() is called at
+        self.fps = min(fps, max_fps(path) or fps)  # Rate frames are written at
+        self.offered = 0  # capture() calls, kept or not
+        self.block = block  # Wait for a free buffer instead of dropping the frame
+        self.frames = 0
+        self.dropped = 0
+
+        check_output(path)
+        if self.format == "gif":
+            self.out_file = open(path, "wb")
+            self.out_file.write(gif_header(self.width, self.height))
+            self.write_lock = threading.Lock()
+            self.unwritten = {}  # Frame index -> encoded bytes waiting on an earlier frame
+            self.written = 0
+        elif self.format == "raw":
+            self.out_file = open(path, "wb")
+            workers = 1  # Frames must reach the file in order
+        else:
+            os.makedirs(path, exist_ok=True)
+
+        # Buffers hold PNG scanlines: a zero filter byte, then the row's pixels
+        self.free = queue.Queue()
+        for _ in range(queue_size):
+            self.free.put(np.zeros((self.height, 1 + self.width * 3), dtype=np.uint8))
+        self.executor = ThreadPoolExecutor(workers)
+        self.error = None
+
+    def capture(self, surface):
+        """Grab one frame; returns False if it had to be dropped
+
+        When the output plays back slower than the frames come in, only
+        enough of them to keep time are kept.
+        """
+        self.offered += 1
+        if (self.offered * self.fps // self.source_fps ==
+                (self.offered - 1) * self.fps // self.source_fps):
+            return True  # Thinned out to the output frame rate
+        try:
+            buffer = self.free.get(block=self.block)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        view = pygame.surfarray.pixels3d(surface)
+        pixels = buffer[:, 1:].reshape(self.height, self.width, 3)
+        np.copyto(pixels, view.transpose(1, 0, 2))
+        del view  # Unlock the surface before it is drawn to again
+        self.frames += 1
+        self.executor.submit(self.encode, self.frames, buffer)
+        return True
+
+    def encode(self, index, buffer):
+        data = b""
+        try:
+            if self.format == "png":
+                data = png_bytes(buffer, self.width, self.height)
+                with open(os.path.join(self.path, f"frame_{index:06d}.png"), "wb") as f:
+                    f.write(data)
+            elif self.format == "gif":
+                pixels = buffer[:, 1:].reshape(self.height, self.width, 3)
+                image = Image.fromarray(pixels).quantize(256, method=Image.Quantize.FASTOCTREE)
+                # Whole hundredths per frame, alternating so the clip keeps time
+                delay = round(100 * index / self.fps) - round(100 * (index - 1) / self.fps)
+                data = gif_frame(image, delay)
+            else:
+                self.out_file.write(buffer[:, 1:].tobytes())
+        except Exception as e:  # Surface the first failure from close()
+            self.error = self.error or e
+        finally:
+            self.free.put(buffer)
+            if self.format == "gif":
+                self.write_in_order(index, data)  # A failed frame is skipped, not waited for
+
+    def write_in_order(self, index, data):
+        """Append a frame to the GIF once every earlier frame is in"""
+        with self.write_lock:
+            self.unwritten[index] = data
+            while self.written + 1 in self.unwritten:
+                self.written += 1
+                self.out_file.write(self.unwritten.pop(self.written))
+
+    def close(self):
+        """Finish encoding and write out anything kept until the end"""
+        self.executor.shutdown(wait=True)
+        if self.format == "gif":
+            self.out_file.write(b"\x3b")  # Trailer
+        if self.format != "png":
+            self.out_file.close()
+        if self.error is not None:
+            raise self.error
@@ -1,128 +1,179 @@
+import time
+STARTUP_TIME = time.perf_counter()  # Taken before the heavy imports for --startup-profile
+
 import pygame
 import sys
-import random
-import time
+import argparse
 import os
-import struct
-import wave
-import math
-
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()
-
-class FallingObject:
-    def __init__(self, x, y, speed, object_type):
-        self.x = x
-        self.y = y
-        self.speed = speed
-        self.type = object_type  # 0 = good, 1 = bad
-        self.width = 40
-        self.height = 40
-        self.caught = False
-        self.missed = False
-    
-    def update(self, dt):
-        self.y += self.speed * dt
-        
+import getpass
+
+import governor
+import simulation
+import sprites
+import synth
+from sprites import SpriteCache
+from text_cache import TextCache
+from simulation import Simulation, ObjectView
+from profiler import FrameProfiler
+from startup import StartupProfiler
+from recording import Recorder
+from voices import VoiceManager
+from leaderboard import Leaderboard, default_database_path
+from capture import FrameCapture, check_output
+from governor import FrameGovernor
+from widgets import Button, WidgetLayer
+from assets import AssetManager, game_manifest
+
+IMPORTS_DONE = time.perf_counter()
+
+class FallingObject(simulation.FallingObject):
+    """Falling object that knows how to draw itself"""
+    __slots__ = ()
+
     def draw(self, screen):
         if self.type == 0:  # Good object (apple)
-            color = (255, 0, 0)  # Red
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y)), 20)
-            # Draw stem
-            pygame.draw.rect(screen, (101, 67, 33), (int(self.x - 2), int(self.y - 25), 4, 10))
-            # Draw leaf
-            pygame.draw.ellipse(screen, (0, 128, 0), (int(self.x + 2), int(self.y - 25), 10, 6))
+            sprites.draw_apple(screen, self.x, self.y)
         else:  # Bad object (rock)
-            color = (100, 100, 100)  # Gray
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y)), 20)
-            # Add some texture to the rock
-            for i in range(3):
-                pygame.draw.circle(screen, (80, 80, 80), 
-                                  (int(self.x - 5 + i*10), int(self.y - 5)), 5)
-
-    def check_caught(self, basket_x, basket_width, basket_y):
-        if (self.y >= basket_y - 10 and 
-            self.y <= basket_y + 10 and 
-            self.x >= basket_x - basket_width//2 and 
-            self.x <= basket_x + basket_width//2):
-            return True
-        return False
-        
-    def check_missed(self, screen_height):
-        if self.y > screen_height:
-            return True
-        return False
+            sprites.draw_rock(screen, self.x, self.y)
+
+
+if ObjectView is not None:
+    class StoredFallingObject(ObjectView):
+        """Array-backed falling object that draws like a FallingObject"""
+        __slots__ = ()
+        draw = FallingObject.draw
+else:
+    StoredFallingObject = None
 
 
 class CatchGame:
     # Constants
-    WIDTH, HEIGHT = 800, 600
+    WIDTH, HEIGHT = Simulation.WIDTH, Simulation.HEIGHT
     BG_COLOR = (135, 206, 235)  # Sky blue
     TEXT_COLOR = (0, 0, 0)  # Black
     TITLE_COLOR = (0, 100, 0)  # Dark green
     BUTTON_COLOR = (70, 130, 180)  # Steel blue
     BUTTON_HOVER_COLOR = (100, 149, 237)  # Cornflower blue
     BUTTON_SELECTED_COLOR = (25, 25, 112)  # Midnight blue
-    GAME_DURATION = 60  # Game lasts 60 seconds
+    GAME_DURATION = Simulation.GAME_DURATION
 
     # Difficulty settings
-    DIFFICULTY = {
-        "Easy": {"spawn_rate": 1.5, "speed_range": (100, 200)},
-        "Medium": {"spawn_rate": 1.0, "speed_range": (150, 250)},
-        "Hard": {"spawn_rate": 0.7, "speed_range": (200, 300)}
-    }
+    DIFFICULTY = Simulation.DIFFICULTY
+
+    DIRTY_RECT_LIMIT = 400  # Above this many rects a full flip is cheaper
+    TICK_RATE = 120  # Simulation steps per second, independent of the frame rate
+    MAX_CATCH_UP = 0.25  # Seconds of simulation a single frame may catch up on
+    CLOUD_LAYERS = (5, 2, 0)  # Clouds in the backgrounds per quality level
+    MUSIC = {"Easy": "music1", "Medium": "music2", "Hard": "music3"}  # Track per difficulty
+    MUSIC_VOLUME = 0.3
 
-    def __init__(self):
+    def __init__(self, use_array_store=False, dirty_rects=False, sound_files=False, sound_cache=None,
+                 startup=None, use_scheduler=False, profiler=None, recorder=None, tick_rate=TICK_RATE,
+                 leaderboard=None, player="player", capture=None, quality="auto",
+                 use_timeline=False, level=None):
+        # Only the subsystems we use are initialised, not all of pygame.init()
+        self.startup = startup or StartupProfiler()
+        self.startup_profile = startup is not None
+        
         # Set up the display
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Catch the Falling Objects")
+        with self.startup.phase("display"):
+            pygame.display.init()
+            self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+            pygame.display.set_caption("Catch the Falling Objects")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont(None, 36)
-        self.title_font = pygame.font.SysFont(None, 72, bold=True)
+        
+        # The default font directly; SysFont(None) would scan system fonts first
+        with self.startup.phase("fonts"):
+            pygame.font.init()
+            self.font = pygame.font.Font(None, 36)
+            self.title_font = pygame.font.Font(None, 72)
+            self.title_font.set_bold(True)
+            self.small_font = pygame.font.Font(None, 24)
+        self.sprites = SpriteCache()
+        self.text_cache = TextCache()
+        
+        # Rendering state
+        self.backgrounds = {}  # Static layers per (screen, quality level)
+        
+        # Rendering quality: fixed, or chosen by the governor from frame times
+        self.governor = FrameGovernor() if quality == "auto" else None
+        self.quality = governor.HIGH if quality == "auto" else governor.LEVEL_NAMES.index(quality)
+        self.sprites.quality = self.quality
+        self.dirty_rects = dirty_rects
+        self.drawn_state = None  # Screen shown by the previous frame
+        self.moved_rects = []  # Objects and basket drawn by the previous frame
+        self.hud = {}  # HUD field -> (text, surface, rect) currently on screen
+        self.play_area = pygame.Rect(0, 52, self.WIDTH, self.HEIGHT - 52)  # Below the HUD panel
+        
+        # Frame-phase profiler; F3 toggles its overlay
+        self.profiler = profiler or FrameProfiler()
+        self.overlay_surface = None
+        self.overlay_frame = 0
         
         # Game state
-        self.score = 0
-        self.misses = 0
-        self.game_start_time = None
         self.game_over = False
-        self.last_spawn_time = 0
         self.current_difficulty = "Medium"
         self.game_state = "menu"  # Can be "menu", "playing", "game_over"
+        self.widgets = self.create_widgets()  # Screen name -> WidgetLayer
+        self.drawn_board = None  # Leaderboard entries on screen, to spot updates
         
         # Player's basket
-        self.basket_width = 100
+        self.basket_width = Simulation.BASKET_WIDTH
         self.basket_height = 50
         self.basket_x = self.WIDTH // 2
-        self.basket_y = self.HEIGHT - 50
-        
-        # Falling objects
-        self.objects = []
-        
-        # Load sounds
+        self.basket_y = Simulation.BASKET_Y
+        
+        # Simulation core; this class only renders it and feeds it input
+        self.sim = Simulation(self.current_difficulty, timestep=1 / tick_rate,
+                              object_class=FallingObject, use_array_store=use_array_store,
+                              view_class=StoredFallingObject, use_scheduler=use_scheduler,
+                              use_timeline=use_timeline)
+        if use_array_store and not self.sim.use_array_store:
+            print("Warning: NumPy not available, using list object store")
+        if use_timeline and not self.sim.use_timeline:
+            print("Warning: NumPy not available, spawning one object per interval")
+        self.level = level  # Scripted level played instead of the chosen difficulty, if set
+        self.recorder = recorder  # Saves each finished round's input when set
+        self.leaderboard = leaderboard  # Results store, or None to keep no results
+        self.player = player
+        self.capture = capture  # FrameCapture fed every drawn frame, or None
+        self.accumulator = 0.0  # Frame time not yet simulated, always under one step
+        
+        # Load sounds and music in the background while the menu comes up;
+        # whatever is not ready yet the game simply plays without
         self.sound_dir = os.path.join(os.path.dirname(__file__), "sounds")
-        self.load_sounds()
+        extras_dir = os.path.join(os.path.dirname(__file__), "web_game", "sounds")
+        self.sound_files = sound_files  # Load WAVs from sound_dir instead of synthesizing
+        self.sound_cache = sound_cache
+        self.assets = AssetManager(game_manifest(self.sound_dir, extras_dir, sound_files),
+                                   cache_dir=sound_cache, startup=self.startup,
+                                   prepare=self.create_default_sounds if sound_files else None)
+        self.sounds = self.assets.loaded  # Filled in by the loader as assets arrive
+        self.voices = VoiceManager()  # Plays queued effects once per frame
+        self.music = None  # Track looping during the current round
+        self.loading_rect = pygame.Rect(10, 10, 220, self.small_font.get_linesize())
+        self.drawn_progress = None  # Loading progress shown on the menu
+        self.assets.start()
 
-    def load_sounds(self):
-        """Load game sound effects"""
-        self.sounds = {}
-        
-        # Create simple sound files if they don't exist
-        self.create_default_sounds()
-        
-        # Load the sounds
-        try:
-            self.sounds["catch"] = pygame.mixer.Sound(os.path.join(self.sound_dir, "catch.wav"))
-            self.sounds["miss"] = pygame.mixer.Sound(os.path.join(self.sound_dir, "miss.wav"))
-            self.sounds["bad_catch"] = pygame.mixer.Sound(os.path.join(self.sound_dir, "bad_catch.wav"))
-        except:
-            print("Warning: Could not load sound files")
+    @property
+    def score(self):
+        return self.sim.score
+
+    @property
+    def misses(self):
+        return self.sim.misses
+
+    @property
+    def objects(self):
+        """Falling objects currently in flight"""
+        return self.sim.objects
+
+    def wait_for_audio(self):
+        """Block until the background asset loading has finished"""
+        self.assets.wait()
 
     def create_default_sounds(self):
         """Create simple sound files if they don't exist"""
-        import wave
-        import struct
-        
         # Only create if they don't exist
         if not os.path.exists(self.sound_dir):
             os.makedirs(self.sound_dir)
@@ -144,167 +195,208 @@ class CatchGame:
 
     def create_simple_sound(self, filename, frequency=440, duration=0.5, volume=1.0):
         """Create a simple sine wave sound file"""
-        sample_rate = 44100
-        num_samples = int(duration * sample_rate)
-        
-        # Create sine wave
-        buf = []
-        for i in range(num_samples):
-            sample = int(32767.0 * volume * 
-                        math.sin(2 * math.pi * frequency * i / sample_rate))
-            buf.append(struct.pack('h', sample))
-        
-        # Write to file
-        with wave.open(filename, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(sample_rate)
-            wf.writeframes(b''.join(buf))
-
-    def draw_button(self, rect, color, text, hover=False):
-        """Helper to draw a button with proper text centering"""
-        # Draw button background
-        pygame.draw.rect(self.screen, color, rect, 0, 10)
-        
-        # Draw text
-        text_surf = self.font.render(text, True, (255, 255, 255))
-        text_rect = text_surf.get_rect(center=rect.center)
-        self.screen.blit(text_surf, text_rect)
-        
-        # Return True if mouse is over button and clicked
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_clicked = pygame.mouse.get_pressed()[0]
-        
-        if rect.collidepoint(mouse_pos):
-            if hover:
-                pygame.draw.rect(self.screen, self.BUTTON_HOVER_COLOR, rect, 0, 10)
-                self.screen.blit(text_surf, text_rect)
-            return mouse_clicked
-        
-        return False
+        synth.write_wav(filename, synth.tone(frequency, duration, volume))
 
     def draw_basket(self):
         """Draw the player's basket"""
-        # Draw basket
-        basket_rect = pygame.Rect(
-            self.basket_x - self.basket_width // 2,
-            self.basket_y - self.basket_height // 2,
-            self.basket_width,
-            self.basket_height
-        )
-        
-        # Draw basket body (brown)
-        pygame.draw.rect(self.screen, (139, 69, 19), basket_rect, 0, 5)
-        
-        # Draw basket rim
-        pygame.draw.rect(self.screen, (101, 67, 33), 
-                        (basket_rect.left, basket_rect.top, basket_rect.width, 10), 0, 5)
-        
-        # Draw basket handle
-        handle_height = 20
-        handle_width = self.basket_width // 2
-        handle_rect = pygame.Rect(
-            self.basket_x - handle_width // 2,
-            self.basket_y - self.basket_height // 2 - handle_height,
-            handle_width,
-            handle_height
-        )
-        pygame.draw.rect(self.screen, (101, 67, 33), handle_rect, 3, 5)
+        return self.sprites.draw_basket(self.screen, self.basket_x, self.basket_y,
+                                        self.basket_width, self.basket_height)
 
-    def show_menu(self):
-        """Display the main menu"""
+    def get_background(self, name):
+        """Return the cached static background for a screen"""
+        key = (name, self.quality)
+        background = self.backgrounds.get(key)
+        if background is None:
+            background = self.backgrounds[key] = self.render_background(name)
+        return background
+
+    def set_quality(self, level):
+        """Switch the rendering quality level; the next frame is redrawn in full"""
+        self.quality = level
+        self.sprites.quality = level
+        self.drawn_state = None
+
+    def render_background(self, name):
+        """Render everything on a screen that never changes"""
+        surface = pygame.Surface((self.WIDTH, self.HEIGHT)).convert()
+        
         # Background - sky with clouds
-        self.screen.fill(self.BG_COLOR)
+        surface.fill(self.BG_COLOR)
         
         # Draw some clouds
-        for i in range(5):
+        for i in range(self.CLOUD_LAYERS[self.quality]):
             cloud_x = 100 + i * 150
             cloud_y = 100 + (i % 3) * 50
-            self.draw_cloud(cloud_x, cloud_y)
+            self.draw_cloud(cloud_x, cloud_y, surface)
         
         # Draw ground
-        pygame.draw.rect(self.screen, (76, 153, 0), (0, self.HEIGHT - 20, self.WIDTH, 20))
-        
-        # Title
-        title_shadow = self.title_font.render("CATCH THE FALLING OBJECTS", True, (0, 0, 0))
-        title_text = self.title_font.render("CATCH THE FALLING OBJECTS", True, self.TITLE_COLOR)
+        pygame.draw.rect(surface, (76, 153, 0), (0, self.HEIGHT - 20, self.WIDTH, 20))
+        
+        if name == "playing":
+            # UI panel at the top
+            panel_rect = pygame.Rect(0, 0, self.WIDTH, 50)
+            pygame.draw.rect(surface, (255, 255, 255, 180), panel_rect)
+            pygame.draw.line(surface, (0, 0, 0), (0, 50), (self.WIDTH, 50), 2)
+        elif name == "menu":
+            self.draw_title(surface, "CATCH THE FALLING OBJECTS")
+            
+            # Difficulty label
+            diff_label = self.font.render("Select Difficulty:", True, self.TEXT_COLOR)
+            diff_label_rect = diff_label.get_rect(center=(self.WIDTH // 2, 250))
+            surface.blit(diff_label, diff_label_rect)
+            
+            # Instructions
+            instructions = [
+                "Catch the falling apples with your basket",
+                "Avoid catching rocks",
+                "Move the basket with your mouse"
+            ]
+            
+            for i, instruction in enumerate(instructions):
+                text = self.font.render(instruction, True, self.TEXT_COLOR)
+                text_rect = text.get_rect(center=(self.WIDTH // 2, 500 + i * 30))
+                surface.blit(text, text_rect)
+        elif name == "game_over":
+            self.draw_title(surface, "GAME OVER")
+        return surface
+
+    def draw_title(self, surface, title):
+        """Draw a screen title with its drop shadow"""
+        title_shadow = self.title_font.render(title, True, (0, 0, 0))
+        title_text = self.title_font.render(title, True, self.TITLE_COLOR)
         shadow_rect = title_shadow.get_rect(center=(self.WIDTH // 2 + 4, 74))
         title_rect = title_text.get_rect(center=(self.WIDTH // 2, 70))
-        self.screen.blit(title_shadow, shadow_rect)
-        self.screen.blit(title_text, title_rect)
-        
+        surface.blit(title_shadow, shadow_rect)
+        surface.blit(title_text, title_rect)
+
+    def create_widgets(self):
+        """Build the buttons of the menu and game over screens"""
         # Start game button
-        start_button = pygame.Rect(self.WIDTH // 2 - 150, 150, 300, 60)
-        if self.draw_button(start_button, self.BUTTON_COLOR, "Start Game", True):
-            self.reset_game()
-            self.game_state = "playing"
-        
-        # Difficulty label
-        diff_label = self.font.render("Select Difficulty:", True, self.TEXT_COLOR)
-        diff_label_rect = diff_label.get_rect(center=(self.WIDTH // 2, 250))
-        self.screen.blit(diff_label, diff_label_rect)
+        start_button = Button((self.WIDTH // 2 - 150, 150, 300, 60), "Start Game", self.start_game)
         
         # Difficulty buttons
-        difficulties = ["Easy", "Medium", "Hard"]
-        for i, diff in enumerate(difficulties):
+        self.difficulty_buttons = {}
+        for i, diff in enumerate(["Easy", "Medium", "Hard"]):
             y_pos = 300 + i * 80
-            diff_button = pygame.Rect(self.WIDTH // 2 - 150, y_pos, 300, 60)
-            
-            # Use selected color if this is the current difficulty
-            button_color = self.BUTTON_SELECTED_COLOR if diff == self.current_difficulty else self.BUTTON_COLOR
-            
-            # Draw selection indicator
-            if diff == self.current_difficulty:
-                indicator = pygame.Rect(self.WIDTH // 2 - 170, y_pos + 20, 10, 20)
-                pygame.draw.rect(self.screen, (255, 215, 0), indicator)
-            
-            # Draw the button and check for clicks
-            if self.draw_button(diff_button, button_color, diff, diff != self.current_difficulty):
-                if diff != self.current_difficulty:
-                    self.current_difficulty = diff
-                    pygame.time.delay(200)  # Prevent multiple clicks
-        
-        # Instructions
-        instructions = [
-            "Catch the falling apples with your basket",
-            "Avoid catching rocks",
-            "Move the basket with your mouse"
-        ]
+            self.difficulty_buttons[diff] = Button(
+                (self.WIDTH // 2 - 150, y_pos, 300, 60), diff,
+                lambda diff=diff: self.select_difficulty(diff), selected=diff == self.current_difficulty)
         
-        for i, instruction in enumerate(instructions):
-            text = self.font.render(instruction, True, self.TEXT_COLOR)
-            text_rect = text.get_rect(center=(self.WIDTH // 2, 500 + i * 30))
-            self.screen.blit(text, text_rect)
+        # Menu button
+        menu_button = Button((self.WIDTH // 2 - 150, 400, 300, 60), "Main Menu", self.show_main_menu)
+        
+        return {
+            "menu": WidgetLayer([start_button] + list(self.difficulty_buttons.values())),
+            "game_over": WidgetLayer([menu_button]),
+        }
+
+    def start_game(self):
+        self.assets.wait_required()  # Brief; the round starts without them if they are late
+        self.reset_game()
+        self.game_state = "playing"
+        self.play_music()
+
+    def play_music(self):
+        """Loop the current difficulty's track, if it has loaded"""
+        self.stop_music()
+        track = self.sounds.get(self.MUSIC[self.current_difficulty])
+        if track is None:
+            return
+        if self.voices.channels is None:
+            self.voices.reserve()  # So the music cannot land on an effect's channel
+        channel = track.play(loops=-1)
+        if channel is not None:
+            channel.set_volume(self.MUSIC_VOLUME)
+            self.music = track
+
+    def stop_music(self):
+        if self.music is not None:
+            self.music.stop()
+            self.music = None
+
+    def select_difficulty(self, difficulty):
+        self.current_difficulty = difficulty
+        for diff, button in self.difficulty_buttons.items():
+            button.set(selected=diff == difficulty)
+        self.drawn_state = None  # The indicator and leaderboard move too
 
-    def draw_cloud(self, x, y):
+    def show_main_menu(self):
+        self.game_state = "menu"
+
+    def screen_changed(self, name):
+        """Whether a menu screen needs a full redraw rather than just its widgets"""
+        board = self.leaderboard.top(self.current_difficulty) if self.leaderboard else None
+        if self.drawn_state != name or board is not self.drawn_board:
+            self.drawn_board = board
+            return True
+        return False
+
+    def draw_widgets(self, name, full_redraw):
+        """Draw a screen's widgets; all of them after a full redraw"""
+        layer = self.widgets[name]
+        if full_redraw:
+            layer.hover(pygame.mouse.get_pos())  # The mouse may already be over a button
+            layer.invalidate()
+        return layer.draw(self.screen, self.get_background(name), self.font, self.text_cache, self)
+
+    def show_menu(self):
+        """Display the main menu
+
+        Returns the rects of widgets that changed, or None when the whole
+        screen was redrawn.
+        """
+        if not self.screen_changed("menu"):
+            rects = self.draw_widgets("menu", False)
+            loading_rect = self.draw_loading(False)
+            if loading_rect:
+                rects.append(loading_rect)
+            return rects
+        
+        self.screen.blit(self.get_background("menu"), (0, 0))
+        
+        # Draw selection indicator
+        button = self.difficulty_buttons[self.current_difficulty]
+        indicator = pygame.Rect(self.WIDTH // 2 - 170, button.rect.y + 20, 10, 20)
+        pygame.draw.rect(self.screen, (255, 215, 0), indicator)
+        
+        self.draw_widgets("menu", True)
+        self.draw_leaderboard((self.WIDTH - 195, 290))
+        self.draw_loading(True)
+        return None
+
+    def draw_loading(self, full_redraw):
+        """Show asset loading progress on the menu; returns the rect drawn, if any"""
+        progress = None if self.assets.finished.is_set() else self.assets.progress()
+        if progress == self.drawn_progress and not full_redraw:
+            return None
+        self.drawn_progress = progress
+        rect = self.loading_rect
+        self.screen.blit(self.get_background("menu"), rect, rect)
+        if progress:
+            text = f"Loading assets {progress[0]}/{progress[1]}"
+            text_surf = self.text_cache.render(self.small_font, text, True, self.TEXT_COLOR)
+            self.screen.blit(text_surf, rect)
+        return rect
+
+    def draw_cloud(self, x, y, surface=None):
         """Draw a simple cloud"""
+        surface = surface or self.screen
         cloud_color = (255, 255, 255)
-        pygame.draw.circle(self.screen, cloud_color, (x, y), 30)
-        pygame.draw.circle(self.screen, cloud_color, (x + 20, y - 10), 25)
-        pygame.draw.circle(self.screen, cloud_color, (x + 40, y), 30)
-        pygame.draw.circle(self.screen, cloud_color, (x + 20, y + 10), 25)
+        pygame.draw.circle(surface, cloud_color, (x, y), 30)
+        pygame.draw.circle(surface, cloud_color, (x + 20, y - 10), 25)
+        pygame.draw.circle(surface, cloud_color, (x + 40, y), 30)
+        pygame.draw.circle(surface, cloud_color, (x + 20, y + 10), 25)
 
     def show_game_over(self):
-        """Display the game over screen"""
-        # Background - sky with clouds
-        self.screen.fill(self.BG_COLOR)
-        
-        # Draw some clouds
-        for i in range(5):
-            cloud_x = 100 + i * 150
-            cloud_y = 100 + (i % 3) * 50
-            self.draw_cloud(cloud_x, cloud_y)
-        
-        # Draw ground
-        pygame.draw.rect(self.screen, (76, 153, 0), (0, self.HEIGHT - 20, self.WIDTH, 20))
+        """Display the game over screen
+
+        Returns the rects of widgets that changed, or None when the whole
+        screen was redrawn.
+        """
+        if not self.screen_changed("game_over"):
+            return self.draw_widgets("game_over", False)
         
-        # Game over text
-        game_over_shadow = self.title_font.render("GAME OVER", True, (0, 0, 0))
-        game_over_text = self.title_font.render("GAME OVER", True, self.TITLE_COLOR)
-        shadow_rect = game_over_shadow.get_rect(center=(self.WIDTH // 2 + 4, 74))
-        text_rect = game_over_text.get_rect(center=(self.WIDTH // 2, 70))
-        self.screen.blit(game_over_shadow, shadow_rect)
-        self.screen.blit(game_over_text, text_rect)
+        self.screen.blit(self.get_background("game_over"), (0, 0))
         
         # Create a stats panel
         stats_panel = pygame.Rect(self.WIDTH // 2 - 200, 150, 400, 200)
@@ -315,114 +407,166 @@ class CatchGame:
         stats_texts = [
             f"Final Score: {self.score}",
             f"Misses: {self.misses}",
-            f"Difficulty: {self.current_difficulty}"
+            f"Difficulty: {self.sim.difficulty}"
         ]
         
         for i, text in enumerate(stats_texts):
-            text_surf = self.font.render(text, True, self.TEXT_COLOR)
+            text_surf = self.text_cache.render(self.font, text, True, self.TEXT_COLOR)
             text_rect = text_surf.get_rect(center=(stats_panel.centerx, stats_panel.y + 50 + i * 50))
             self.screen.blit(text_surf, text_rect)
         
-        # Draw menu button
-        menu_button = pygame.Rect(self.WIDTH // 2 - 150, 400, 300, 60)
-        if self.draw_button(menu_button, self.BUTTON_COLOR, "Main Menu", True):
-            self.game_state = "menu"
+        self.draw_leaderboard((self.WIDTH - 195, 150))
+        self.draw_widgets("game_over", True)
+        return None
 
-    def draw_game_ui(self):
-        """Draw the game UI elements"""
-        # Draw UI panel at the top
-        panel_rect = pygame.Rect(0, 0, self.WIDTH, 50)
-        pygame.draw.rect(self.screen, (255, 255, 255, 180), panel_rect)
-        pygame.draw.line(self.screen, (0, 0, 0), (0, 50), (self.WIDTH, 50), 2)
+    def draw_leaderboard(self, topleft):
+        """Draw the cached top scores for the current difficulty"""
+        if not self.leaderboard:
+            return
+        entries = self.leaderboard.top(self.current_difficulty)
+        lines = [f"Top {self.leaderboard.top_k} - {self.current_difficulty}"]
+        lines += [f"{i}. {entry.score}  {entry.player[:10]}" for i, entry in enumerate(entries, 1)]
+        if not entries:
+            lines.append("No results yet")
+        
+        line_height = self.small_font.get_linesize() + 4
+        panel = pygame.Rect(topleft, (185, line_height * (self.leaderboard.top_k + 1) + 20))
+        pygame.draw.rect(self.screen, (255, 255, 255), panel, 0, 10)
+        pygame.draw.rect(self.screen, (0, 0, 0), panel, 2, 10)
+        for i, line in enumerate(lines):
+            text_surf = self.text_cache.render(self.small_font, line, True, self.TEXT_COLOR)
+            self.screen.blit(text_surf, (panel.x + 12, panel.y + 10 + i * line_height))
+
+    def draw_game_ui(self, changed_only=False):
+        """Draw the game UI elements and return the rects they cover
+
+        The panel itself is part of the playing background. A field is
+        only re-rendered when its text changes. With changed_only, fields
+        whose text is already on screen are skipped and the background is
+        restored under fields that changed.
+        """
+        # Timer
+        remaining = self.sim.remaining
         
-        # Score
-        score_text = self.font.render(f"Score: {self.score}", True, self.TEXT_COLOR)
-        self.screen.blit(score_text, (20, 10))
+        fields = [
+            ("score", f"Score: {self.score}", {"topleft": (20, 10)}),
+            ("misses", f"Misses: {self.misses}", {"midright": (self.WIDTH - 20, 25)}),
+            ("timer", f"Time: {int(remaining)}s", {"center": (self.WIDTH // 2, 25)}),
+        ]
         
-        # Misses
-        misses_text = self.font.render(f"Misses: {self.misses}", True, self.TEXT_COLOR)
-        misses_rect = misses_text.get_rect(midright=(self.WIDTH - 20, 25))
-        self.screen.blit(misses_text, misses_rect)
+        rects = []
+        for name, text, position in fields:
+            previous = self.hud.get(name)
+            if previous and previous[0] == text:
+                if changed_only:
+                    continue
+                _, text_surf, text_rect = previous
+            else:
+                if changed_only and previous:
+                    background = self.get_background("playing")
+                    self.screen.blit(background, previous[2], previous[2])
+                    rects.append(previous[2])
+                text_surf = self.text_cache.render(self.font, text, True, self.TEXT_COLOR)
+                text_rect = text_surf.get_rect(**position)
+                self.hud[name] = (text, text_surf, text_rect)
+            self.screen.blit(text_surf, text_rect)
+            rects.append(text_rect)
+        return rects
+
+    def draw_playing(self):
+        """Draw the playing screen
+
+        Returns the list of rects that changed, or None when the whole
+        screen was redrawn and needs a full flip.
+        """
+        background = self.get_background("playing")
+        full_redraw = (not self.dirty_rects or self.drawn_state != "playing" or
+                       len(self.moved_rects) > self.DIRTY_RECT_LIMIT)
+        
+        if full_redraw:
+            self.screen.blit(background, (0, 0))
+            restored = []
+        else:
+            # Restore the background under last frame's objects and basket
+            restored = self.moved_rects
+            self.screen.blits([(background, rect, rect) for rect in restored], doreturn=False)
+        
+        # Objects and basket stay below the UI panel
+        self.screen.set_clip(self.play_area)
+        
+        # Draw falling objects between the last two steps, by how far into
+        # the next step the frame time has got
+        lag = self.sim.timestep - self.accumulator
+        moved = self.screen.blits(self.sprites.object_blits(self.objects, lag=lag))
         
-        # Timer
-        elapsed = time.time() - self.game_start_time if self.game_start_time else 0
-        remaining = max(0, self.GAME_DURATION - elapsed)
+        # Draw basket
+        moved.append(self.draw_basket())
+        self.screen.set_clip(None)
+        self.moved_rects = [rect.clip(self.play_area) for rect in moved]
         
-        # Timer text
-        timer_text = self.font.render(f"Time: {int(remaining)}s", True, self.TEXT_COLOR)
-        timer_rect = timer_text.get_rect(center=(self.WIDTH // 2, 25))
-        self.screen.blit(timer_text, timer_rect)
+        # Draw UI
+        ui_rects = self.draw_game_ui(changed_only=not full_redraw)
+        
+        if full_redraw:
+            return None
+        return restored + self.moved_rects + ui_rects
 
     def reset_game(self):
         """Reset the game state to start a new game"""
-        self.score = 0
-        self.misses = 0
-        self.game_start_time = time.time()
-        self.last_spawn_time = time.time()
         self.game_over = False
-        self.objects = []
-        
-        # Set difficulty parameters
-        self.spawn_rate = self.DIFFICULTY[self.current_difficulty]["spawn_rate"]
-        self.speed_range = self.DIFFICULTY[self.current_difficulty]["speed_range"]
+        self.accumulator = 0.0
+        self.voices.clear()
+        self.sim.reset(self.level or self.current_difficulty)
+        if self.recorder:
+            self.recorder.start(self.sim)
 
     def spawn_object(self):
         """Spawn a new falling object"""
-        x = random.randint(50, self.WIDTH - 50)
-        y = -20  # Start above the screen
-        speed = random.randint(self.speed_range[0], self.speed_range[1])
-        object_type = 0 if random.random() < 0.7 else 1  # 70% chance for good objects
-        
-        self.objects.append(FallingObject(x, y, speed, object_type))
+        self.sim.spawn_object()
 
     def update(self, dt):
-        """Update game state"""
-        # Check if game is over
-        if self.game_start_time is not None and time.time() - self.game_start_time >= self.GAME_DURATION:
-            self.game_over = True
-            self.game_state = "game_over"
-            return
-            
+        """Run as many fixed simulation steps as dt seconds of frame time cover
+
+        Whatever is left over carries to the next frame. After a long stall
+        at most MAX_CATCH_UP seconds are simulated, so a slow frame never
+        makes the next one slower still.
+        """
         # Update basket position to follow mouse
         mouse_x, _ = pygame.mouse.get_pos()
         self.basket_x = mouse_x
         
-        # Spawn new objects
-        current_time = time.time()
-        if current_time - self.last_spawn_time > self.spawn_rate:
-            self.spawn_object()
-            self.last_spawn_time = current_time
+        timestep = self.sim.timestep
+        self.accumulator = min(self.accumulator + dt, self.MAX_CATCH_UP)
+        while self.accumulator >= timestep and not self.game_over:
+            self.accumulator -= timestep
+            self.step()
+        self.voices.flush(self.sounds)
+
+    def step(self):
+        """Advance the simulation by one fixed step"""
+        if self.recorder:
+            # Recordings hold whole pixels, so step with exactly what is stored
+            self.basket_x = int(round(self.basket_x))
+            self.recorder.record(self.basket_x, self.sim.timestep)
+        events = self.sim.step(self.basket_x)
         
-        # Update falling objects
-        objects_to_remove = []
-        for obj in self.objects:
-            obj.update(dt)
-            
-            # Check if object is caught
-            if not obj.caught and not obj.missed and obj.check_caught(self.basket_x, self.basket_width, self.basket_y):
-                obj.caught = True
-                if obj.type == 0:  # Good object
-                    self.score += 10
-                    if "catch" in self.sounds:
-                        self.sounds["catch"].play()
-                else:  # Bad object
-                    self.score -= 5
-                    if "bad_catch" in self.sounds:
-                        self.sounds["bad_catch"].play()
-                objects_to_remove.append(obj)
-            
-            # Check if object is missed
-            elif not obj.caught and not obj.missed and obj.check_missed(self.HEIGHT):
-                obj.missed = True
-                if obj.type == 0:  # Only count misses for good objects
-                    self.misses += 1
-                    if "miss" in self.sounds:
-                        self.sounds["miss"].play()
-                objects_to_remove.append(obj)
-        
-        # Remove caught or missed objects
-        for obj in objects_to_remove:
-            self.objects.remove(obj)
+        # Check if game is over
+        if self.sim.game_over:
+            if self.recorder:
+                self.recorder.finish()
+            if self.leaderboard:
+                sim = self.sim
+                self.leaderboard.record(self.player, sim.difficulty, sim.score, sim.misses,
+                                        sim.tick, sim.seed)
+            self.game_over = True
+            self.game_state = "game_over"
+            self.stop_music()
+            self.voices.queue("game_over")
+            return
+        
+        # Queue a sound for every catch and miss; update() hands them to the mixer
+        for _, name in events:
+            self.voices.queue(name)
 
     def handle_events(self):
         """Process pygame events"""
@@ -438,66 +582,174 @@ class CatchGame:
                 # Handle initial touch
                 touch_x = event.x * self.WIDTH
                 self.basket_x = touch_x
+            elif event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                layer = self.widgets.get(self.game_state)
+                if layer:
+                    layer.handle_event(event)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+                self.drawn_state = None  # Full redraw to add or clear the overlay
         
         return True
 
+    def draw_profiler_overlay(self):
+        """Draw the frame-timing overlay and return its rect"""
+        # Text is only re-rendered twice a second
+        self.overlay_frame += 1
+        if self.overlay_surface is None or self.overlay_frame >= 30:
+            self.overlay_frame = 0
+            lines = [self.text_cache.render(self.font, line, True, (255, 255, 255))
+                     for line in self.profiler.overlay_lines()]
+            line_height = self.font.get_linesize()
+            width = max(line.get_width() for line in lines) + 20
+            self.overlay_surface = pygame.Surface((width, line_height * len(lines) + 20))
+            self.overlay_surface.fill((20, 20, 20))
+            for i, line in enumerate(lines):
+                self.overlay_surface.blit(line, (10, 10 + i * line_height))
+        return self.screen.blit(self.overlay_surface, (10, self.HEIGHT - self.overlay_surface.get_height() - 30))
+
     def run(self):
         """Main game loop"""
         running = True
-        last_time = time.time()
+        last_time = time.perf_counter()
+        first_frame = time.perf_counter()
+        profiler = self.profiler
         
         while running:
+            profiler.start_frame()
+            
             # Calculate delta time
-            current_time = time.time()
+            current_time = time.perf_counter()
             dt = current_time - last_time
             last_time = current_time
             
             # Handle events
             running = self.handle_events()
+            profiler.mark("events")
             
             # Update game state if playing
             if self.game_state == "playing" and not self.game_over:
                 self.update(dt)
+            profiler.mark("update")
             
             # Draw everything
+            dirty = None
             if self.game_state == "menu":
-                self.show_menu()
+                dirty = self.show_menu()
             elif self.game_state == "playing":
-                # Draw background - sky with clouds
-                self.screen.fill(self.BG_COLOR)
-                
-                # Draw some clouds
-                for i in range(5):
-                    cloud_x = 100 + i * 150
-                    cloud_y = 100 + (i % 3) * 50
-                    self.draw_cloud(cloud_x, cloud_y)
-                
-                # Draw ground
-                pygame.draw.rect(self.screen, (76, 153, 0), (0, self.HEIGHT - 20, self.WIDTH, 20))
-                
-                # Draw falling objects
-                for obj in self.objects:
-                    obj.draw(self.screen)
-                
-                # Draw basket
-                self.draw_basket()
-                
-                # Draw UI
-                self.draw_game_ui()
-                
+                dirty = self.draw_playing()
             elif self.game_state == "game_over":
-                self.show_game_over()
+                dirty = self.show_game_over()
+            self.drawn_state = self.game_state
+            if profiler.overlay:
+                overlay_rect = self.draw_profiler_overlay()
+                if dirty is not None:
+                    dirty.append(overlay_rect)
+            if self.capture:
+                self.capture.capture(self.screen)
+            profiler.mark("draw")
             
             # Update the display
-            pygame.display.flip()
+            if dirty is None or len(dirty) > self.DIRTY_RECT_LIMIT:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+            profiler.mark("flip")
+            
+            if first_frame is not None:
+                self.startup.record("first frame", first_frame)
+                first_frame = None
+            if self.startup_profile and not self.startup.reported and self.assets.finished.is_set():
+                self.startup.report()
+            if self.governor and self.game_state == "playing":
+                if self.governor.frame(time.perf_counter() - current_time):
+                    self.set_quality(self.governor.level)
             self.clock.tick(60)
+            profiler.mark("sleep")
+            profiler.end_frame(len(self.objects))
         
-        pygame.quit()
+        if profiler.export_path:
+            profiler.export(profiler.export_path)
+        if self.leaderboard:
+            self.leaderboard.close()
+        try:
+            if self.capture:
+                self.capture.close()  # Re-raises the first encoding error
+                print(f"Captured {self.capture.frames} frames to {self.capture.path} "
+                      f"({self.capture.dropped} dropped)")
+        finally:
+            self.assets.stop()
+            pygame.quit()
         sys.exit()
 
 
+def default_player():
+    """Login name to record results under"""
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "player"
+
+
 def main():
-    game = CatchGame()
+    parser = argparse.ArgumentParser(description="Catch the Falling Objects")
+    parser.add_argument("--array-store", action="store_true",
+                        help="keep falling objects in NumPy arrays (needs NumPy)")
+    parser.add_argument("--scheduler", action="store_true",
+                        help="only hit-test objects predicted to be at the basket")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only update the parts of the screen that changed")
+    parser.add_argument("--sound-files", action="store_true",
+                        help="load sound effects from the sounds directory, creating missing ones")
+    parser.add_argument("--sound-cache", metavar="DIR",
+                        help="cache synthesized sound effects in DIR")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print how long each startup phase took")
+    parser.add_argument("--profile", action="store_true",
+                        help="record frame-phase timings from the start (F3 shows them)")
+    parser.add_argument("--profile-export", metavar="PATH",
+                        help="write frame timings to PATH (.csv or .json) on exit")
+    parser.add_argument("--tick-rate", type=int, default=CatchGame.TICK_RATE,
+                        help="simulation steps per second (default %(default)s)")
+    parser.add_argument("--leaderboard", metavar="PATH",
+                        default=default_database_path(),
+                        help="SQLite database finished games are recorded in (default %(default)s)")
+    parser.add_argument("--no-leaderboard", action="store_true", help="do not record results")
+    parser.add_argument("--player", default=default_player(), help="name results are recorded under")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="save every frame: a directory of PNGs, a .gif or raw .rgb frames")
+    parser.add_argument("--quality", choices=("auto",) + governor.LEVEL_NAMES, default="auto",
+                        help="rendering quality; auto lowers it when frames run over budget")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save the input of every finished round to DIR for replay.py")
+    parser.add_argument("--timeline", action="store_true",
+                        help="spawn from a timeline precomputed for each round (needs NumPy)")
+    parser.add_argument("--level", choices=sorted(simulation.LEVELS),
+                        help="play a scripted level instead of the difficulty chosen in the menu")
+    args = parser.parse_args()
+    if args.capture:
+        try:
+            check_output(args.capture)
+        except RuntimeError as e:
+            parser.error(str(e))
+    
+    startup = None
+    if args.startup_profile:
+        startup = StartupProfiler(STARTUP_TIME)
+        startup.record("imports", STARTUP_TIME, IMPORTS_DONE)
+
+    game = CatchGame(use_array_store=args.array_store, dirty_rects=args.dirty_rects,
+                     sound_files=args.sound_files, sound_cache=args.sound_cache,
+                     startup=startup, use_scheduler=args.scheduler,
+                     profiler=FrameProfiler(enabled=args.profile or bool(args.profile_export),
+                                            export_path=args.profile_export),
+                     recorder=Recorder(args.record) if args.record else None,
+                     tick_rate=args.tick_rate,
+                     leaderboard=None if args.no_leaderboard else Leaderboard(args.leaderboard, CatchGame.DIFFICULTY),
+                     player=args.player,
+                     capture=FrameCapture(args.capture, (CatchGame.WIDTH, CatchGame.HEIGHT))
+                     if args.capture else None,
+                     quality=args.quality, use_timeline=args.timeline, level=args.level)
     game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""Frame-budget governor for rendering quality
+
+Watches how long recent frames took to produce (everything but the sleep
+in clock.tick) and steps the rendering quality down when they run over the
+frame budget, and back up once there is plenty of headroom again. Stepping
+down reacts within a short window; stepping up needs a longer run of cheap
+frames and a hold time after every change, so the level does not flicker
+between two settings.
+
+Only drawing is affected; the simulation steps the same at every level.
+"""
+from collections import deque
+
+# Quality levels, best first
+HIGH, MEDIUM, LOW = 0, 1, 2
+LEVEL_NAMES = ("high", "medium", "low")
+
+
+class FrameGovernor:
+    """Chooses a quality level from recent frame work times"""
+
+    def __init__(self, budget=1 / 60, window=30, downgrade_at=1.0, upgrade_at=0.6, hold=180,
+                 lowest=LOW):
+        self.budget = budget
+        self.window = window
+        self.downgrade_at = downgrade_at  # Fraction of the budget that triggers a step down
+        self.upgrade_at = upgrade_at  # Fraction of the budget frames must stay under to step up
+        self.hold = hold  # Frames after a change before stepping up again
+        self.lowest = lowest
+        self.level = HIGH
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+        self.since_change = 0
+        self.changes = 0
+
+    def frame(self, work):
+        """Record one frame's work in seconds; returns True if the level changed"""
+        if len(self.samples) == self.window:
+            self.total -= self.samples[0]
+        self.samples.append(work)
+        self.total += work
+        self.since_change += 1
+        if len(self.samples) < self.window:
+            return False
+
+        average = self.total / self.window
+        if average > self.budget * self.downgrade_at and self.level < self.lowest:
+            return self.set_level(self.level + 1)
+        if (average < self.budget * self.upgrade_at and self.level > HIGH and
+                self.since_change >= self.hold):
+            return self.set_level(self.level - 1)
+        return False
+
+    def set_level(self, level):
+        self.level = level
+        self.samples.clear()
+        self.total = 0.0
+        self.since_change = 0
+        self.changes += 1
+        return True
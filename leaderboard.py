@@ -0,0 +1,172 @@
+"""Persistent results store and leaderboards
+
+Finished games go into a SQLite database in WAL mode. Inserts are queued
+and written in batches by a background thread, so recording a result never
+waits on the disk. Indexes on (difficulty, score) and (player, difficulty,
+score) keep top-K queries an index range scan however large the table gets.
+
+The screens read leaderboards from an in-memory top-K per difficulty. It is
+loaded once by the writer thread and afterwards only touched when a newly
+written result beats its last entry.
+
+The database is only created when the first result is written, so starting
+the game writes nothing. If it cannot be opened or written the game carries
+on without a leaderboard.
+"""
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+Result = namedtuple("Result", ["player", "difficulty", "score", "misses", "ticks", "seed", "played_at"])
+Entry = namedtuple("Entry", ["id", "player", "score", "misses"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    seed INTEGER,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_difficulty ON results (difficulty, score DESC, misses, id);
+CREATE INDEX IF NOT EXISTS results_by_player ON results (player, difficulty, score DESC, misses, id);
+"""
+
+INSERT = ("INSERT INTO results (player, difficulty, score, misses, ticks, seed, played_at) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+TOP = ("SELECT id, player, score, misses FROM results WHERE difficulty = ? "
+       "ORDER BY score DESC, misses, id LIMIT ?")
+
+PLAYER_TOP = ("SELECT id, player, score, misses FROM results WHERE player = ? AND difficulty = ? "
+              "ORDER BY score DESC, misses, id LIMIT ?")
+
+
+def rank_key(entry):
+    """Leaderboard order: highest score, then fewest misses, then earliest"""
+    return (-entry.score, entry.misses, entry.id)
+
+
+def default_database_path():
+    """leaderboard.db in the per-user data directory"""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "catch-falling-objects", "leaderboard.db")
+
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class Leaderboard:
+    """Results database with a background writer and cached top-K lists"""
+
+    def __init__(self, path, difficulties, top_k=5, batch_size=256):
+        self.path = path
+        self.difficulties = list(difficulties)
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.cache = {}  # Difficulty -> tuple of Entry, best first; missing until loaded
+        self.written = 0
+        self.batches = 0
+        self.error = None  # Set when the database failed; results are dropped after that
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def record(self, player, difficulty, score, misses, ticks=0, seed=None):
+        """Queue one finished game; returns immediately"""
+        if self.error is not None:
+            return
+        self.queue.put(Result(player, difficulty, score, misses, ticks, seed, time.time()))
+
+    def top(self, difficulty):
+        """Cached leaderboard for a difficulty (empty until loaded)"""
+        return self.cache.get(difficulty, ())
+
+    def player_top(self, player, difficulty, limit=10):
+        """A player's best results, read straight from the database"""
+        if not os.path.exists(self.path):
+            return []
+        connection = connect(self.path)
+        try:
+            return [Entry(*row) for row in connection.execute(PLAYER_TOP, (player, difficulty, limit))]
+        finally:
+            connection.close()
+
+    def close(self):
+        """Write everything still queued and stop the writer"""
+        self.queue.put(None)
+        self.writer.join()
+
+    def write_loop(self):
+        connection = None
+        try:
+            if os.path.exists(self.path):
+                connection = connect(self.path)
+            for difficulty in self.difficulties:
+                rows = connection.execute(TOP, (difficulty, self.top_k)).fetchall() if connection else []
+                with self.lock:
+                    self.cache[difficulty] = tuple(Entry(*row) for row in rows)
+
+            running = True
+            while running:
+                # Block for the first result, then take whatever else is waiting
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    running = False
+                    batch.pop()
+                if not batch:
+                    continue
+
+                if connection is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    connection = connect(self.path)
+                self.write_batch(connection, batch)
+        except (sqlite3.Error, OSError) as e:
+            self.error = e
+            print(f"Warning: Leaderboard unavailable, results will not be kept: {e}")
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def write_batch(self, connection, batch):
+        entries = []
+        with connection:
+            for result in batch:
+                cursor = connection.execute(INSERT, result)
+                entries.append((result.difficulty, Entry(cursor.lastrowid, result.player,
+                                                         result.score, result.misses)))
+        self.written += len(batch)
+        self.batches += 1
+        for difficulty, entry in entries:
+            self.update_cache(difficulty, entry)
+
+    def update_cache(self, difficulty, entry):
+        """Merge a new result into the cached top-K if it makes the cut"""
+        with self.lock:
+            board = self.cache.get(difficulty, ())
+            if len(board) >= self.top_k and rank_key(entry) > rank_key(board[-1]):
+                return
+            self.cache[difficulty] = tuple(sorted(board + (entry,), key=rank_key)[:self.top_k])
@@ -0,0 +1,108 @@
+"""Scripted client swarm for load-testing server.py
+
+Opens many TCP sessions against a running server. Every client starts a
+round, moves its basket in a random walk at the given input rate and reads
+state until the round is over. At the end the server's tick metrics are
+fetched and printed with the client-side totals.
+
+    python server.py --round-length 20 &
+    python loadtest.py --clients 2000 --ramp 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def client(args, index, results):
+    rng = random.Random(args.seed + index)
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.port, limit=1 << 20)
+    except OSError as e:
+        results["failed"] += 1
+        results["errors"].add(str(e))
+        return
+
+    def send(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    send({"type": "start", "difficulty": rng.choice(["Easy", "Medium", "Hard"]),
+          "seed": args.seed + index})
+
+    async def move():
+        x = 400.0
+        while True:
+            await asyncio.sleep(1 / args.input_rate)
+            x = min(800.0, max(0.0, x + rng.uniform(-40, 40)))
+            send({"type": "input", "x": round(x)})
+
+    mover = asyncio.ensure_future(move())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                results["failed"] += 1
+                break
+            message = json.loads(line)
+            results["messages"] += 1
+            if message["type"] == "over":
+                results["finished"] += 1
+                results["scores"].append(message["score"])
+                break
+            if message["type"] == "error":
+                results["errors"].add(message["message"])
+    except ConnectionError as e:
+        results["failed"] += 1
+        results["errors"].add(str(e))
+    finally:
+        mover.cancel()
+        writer.close()
+
+
+async def fetch_metrics(args):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(b'{"type": "metrics"}\n')
+    metrics = json.loads(await reader.readline())
+    writer.close()
+    return metrics
+
+
+async def swarm(args):
+    results = {"finished": 0, "failed": 0, "messages": 0, "scores": [], "errors": set()}
+    start = time.perf_counter()
+    tasks = []
+    for i in range(args.clients):
+        tasks.append(asyncio.ensure_future(client(args, i, results)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.clients)
+
+    # Sample the server while the swarm is at full size
+    peak = await fetch_metrics(args)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    print(f"clients {args.clients}  finished {results['finished']}  failed {results['failed']}  "
+          f"in {elapsed:.1f} s")
+    print(f"messages received {results['messages']} ({results['messages'] / elapsed:.0f}/s)")
+    if results["scores"]:
+        print(f"mean score {sum(results['scores']) / len(results['scores']):.1f}")
+    for error in sorted(results["errors"]):
+        print(f"error: {error}")
+    print("server at full load:", json.dumps(peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test server.py with scripted clients")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which clients connect")
+    parser.add_argument("--input-rate", type=float, default=20, help="basket inputs per second per client")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(swarm(args))
+
+
+if __name__ == "__main__":
+    main()
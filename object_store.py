@@ -0,0 +1,210 @@
+import numpy as np
+from collections import namedtuple
+
+# Object states
+ACTIVE = 0
+CAUGHT = 1
+MISSED = 2
+
+StepResult = namedtuple("StepResult", ["caught_good", "caught_bad", "missed_good", "missed_bad"])
+
+
+class ObjectView:
+    """FallingObject-compatible view onto one slot of an ObjectStore
+
+    Views are only valid until the next step() of the store, since
+    compaction moves surviving objects to new slots.
+    """
+
+    __slots__ = ("store", "index")
+    width = 40
+    height = 40
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.store.x[self.index])
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.index] = value
+
+    @property
+    def y(self):
+        return float(self.store.y[self.index])
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.index] = value
+
+    @property
+    def speed(self):
+        return float(self.store.speed[self.index])
+
+    @speed.setter
+    def speed(self, value):
+        self.store.speed[self.index] = value
+
+    @property
+    def type(self):
+        return int(self.store.type[self.index])
+
+    @property
+    def caught(self):
+        return self.store.state[self.index] == CAUGHT
+
+    @property
+    def missed(self):
+        return self.store.state[self.index] == MISSED
+
+    def fall_to(self, now):
+        store, i = self.store, self.index
+        store.y[i] = store.spawn_y[i] + store.speed[i] * (now - store.spawn_time[i])
+
+    def check_caught(self, basket_x, basket_width, basket_y, dt=0.0):
+        y = self.y
+        return bool(y >= basket_y - 10 and y - self.speed * dt <= basket_y + 10 and
+                    basket_x - basket_width // 2 <= self.x <= basket_x + basket_width // 2)
+
+    def check_missed(self, screen_height):
+        return self.y > screen_height
+
+
+class ObjectStore:
+    """Struct-of-arrays storage for falling objects
+
+    Positions, speeds, types and states live in contiguous NumPy arrays so
+    that the position update, the basket hit test and the off-screen test
+    run as batched vector operations instead of a Python loop per object.
+    Positions come from the spawn point and time, exactly as
+    FallingObject.fall_to computes them.
+    """
+
+    def __init__(self, capacity=256, view_class=ObjectView):
+        self.view_class = view_class
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        """(Re)allocate the backing arrays, keeping live objects"""
+        n = self.count
+        old = getattr(self, "x", None)
+        x = np.zeros(capacity, dtype=np.float64)
+        y = np.zeros(capacity, dtype=np.float64)
+        speed = np.zeros(capacity, dtype=np.float64)
+        object_type = np.zeros(capacity, dtype=np.int8)
+        state = np.zeros(capacity, dtype=np.int8)
+        spawn_y = np.zeros(capacity, dtype=np.float64)
+        spawn_time = np.zeros(capacity, dtype=np.float64)
+        if old is not None:
+            x[:n] = self.x[:n]
+            y[:n] = self.y[:n]
+            speed[:n] = self.speed[:n]
+            object_type[:n] = self.type[:n]
+            state[:n] = self.state[:n]
+            spawn_y[:n] = self.spawn_y[:n]
+            spawn_time[:n] = self.spawn_time[:n]
+        self.x, self.y, self.speed, self.type, self.state = x, y, speed, object_type, state
+        self.spawn_y, self.spawn_time = spawn_y, spawn_time
+
+    def add(self, x, y, speed, object_type, spawn_time=0.0):
+        """Add one falling object, at y at simulation time spawn_time"""
+        if self.count == len(self.x):
+            self.allocate(len(self.x) * 2)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.speed[i] = speed
+        self.type[i] = object_type
+        self.state[i] = ACTIVE
+        self.spawn_y[i] = y
+        self.spawn_time[i] = spawn_time
+        self.count += 1
+
+    def add_many(self, xs, ys, speeds, object_types, spawn_times):
+        """Add a batch of falling objects from array-likes (or scalars, after xs)"""
+        k = len(xs)
+        needed = self.count + k
+        if needed > len(self.x):
+            capacity = len(self.x)
+            while capacity < needed:
+                capacity *= 2
+            self.allocate(capacity)
+        s = slice(self.count, needed)
+        self.x[s] = xs
+        self.y[s] = ys
+        self.speed[s] = speeds
+        self.type[s] = object_types
+        self.state[s] = ACTIVE
+        self.spawn_y[s] = ys
+        self.spawn_time[s] = spawn_times
+        self.count = needed
+
+    def append(self, obj):
+        """Add a FallingObject-like instance (list API compatibility)"""
+        self.add(obj.x, obj.spawn_y, obj.speed, obj.type, obj.spawn_time)
+
+    def clear(self):
+        self.count = 0
+
+    def step(self, now, dt, basket_x, basket_width, basket_y, screen_height):
+        """Move all objects to time now, resolve catches and misses, drop finished ones"""
+        n = self.count
+        if n == 0:
+            return StepResult(0, 0, 0, 0)
+        x = self.x[:n]
+        y = self.y[:n]
+        object_type = self.type[:n]
+        state = self.state[:n]
+
+        # Positions at now, in the same operation order as FallingObject.fall_to
+        np.multiply(self.speed[:n], now - self.spawn_time[:n], out=y)
+        y += self.spawn_y[:n]
+
+        # Basket hit test swept over this step, same bounds as FallingObject.check_caught
+        half = basket_width // 2
+        active = state == ACTIVE
+        caught = (active & (y >= basket_y - 10) & (y - self.speed[:n] * dt <= basket_y + 10) &
+                  (x >= basket_x - half) & (x <= basket_x + half))
+        # Off-screen test for whatever was not caught this frame
+        missed = active & ~caught & (y > screen_height)
+        state[caught] = CAUGHT
+        state[missed] = MISSED
+
+        bad = object_type != 0
+        caught_bad = int(np.count_nonzero(caught & bad))
+        missed_bad = int(np.count_nonzero(missed & bad))
+        result = StepResult(int(np.count_nonzero(caught)) - caught_bad, caught_bad,
+                            int(np.count_nonzero(missed)) - missed_bad, missed_bad)
+
+        # Remove caught or missed objects in a single compaction pass
+        if result.caught_good or result.caught_bad or result.missed_good or result.missed_bad:
+            keep = np.flatnonzero(state == ACTIVE)
+            k = len(keep)
+            self.x[:k] = x[keep]
+            self.y[:k] = y[keep]
+            self.speed[:k] = self.speed[:n][keep]
+            self.type[:k] = object_type[keep]
+            self.state[:k] = ACTIVE
+            self.spawn_y[:k] = self.spawn_y[:n][keep]
+            self.spawn_time[:k] = self.spawn_time[:n][keep]
+            self.count = k
+        return result
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("object index out of range")
+        return self.view_class(self, index)
+
+    def __iter__(self):
+        view_class = self.view_class
+        for i in range(self.count):
+            yield view_class(self, i)
@@ -0,0 +1,159 @@
+"""Runtime diagnostics: frame-phase timings and garbage collection counts"""
+import csv
+import gc
+import json
+import time
+from array import array
+
+# Phases of one frame of CatchGame.run, in order
+PHASES = ("events", "update", "draw", "flip", "sleep")
+
+
+class RingBuffer:
+    """Fixed-size ring of integer samples"""
+
+    __slots__ = ("data", "size", "count", "index")
+
+    def __init__(self, size):
+        self.data = array("q", bytes(8 * size))
+        self.size = size
+        self.count = 0
+        self.index = 0
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def values(self):
+        """Samples oldest first"""
+        if self.count < self.size:
+            return self.data[:self.count].tolist()
+        return (self.data[self.index:] + self.data[:self.index]).tolist()
+
+    def __len__(self):
+        return self.count
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in ring buffers
+
+    Call start_frame(), then mark(phase) as each phase finishes, then
+    end_frame(). While disabled every call returns straight away; enabling
+    takes effect at the next start_frame().
+    """
+
+    def __init__(self, size=600, enabled=False, export_path=None):
+        self.enabled = enabled
+        self.export_path = export_path  # Where the game writes the timings on exit
+        self.overlay = False
+        self.size = size
+        self.buffers = {phase: RingBuffer(size) for phase in PHASES + ("frame",)}
+        self.objects = RingBuffer(size)
+        self.frame_start = self.last = 0
+        self.recording = False  # Whether the current frame is being recorded
+
+    def start_frame(self):
+        self.recording = self.enabled
+        if not self.recording:
+            return
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        if not self.recording:
+            return
+        now = time.perf_counter_ns()
+        self.buffers[phase].append(now - self.last)
+        self.last = now
+
+    def end_frame(self, object_count=0):
+        if not self.recording:
+            return
+        self.buffers["frame"].append(self.last - self.frame_start)
+        self.objects.append(object_count)
+
+    def toggle_overlay(self):
+        """Show or hide the overlay; showing it starts recording"""
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enabled = True
+
+    def summary(self):
+        """p50/p95/p99 in milliseconds per phase, plus object counts"""
+        stats = {}
+        for phase, buffer in self.buffers.items():
+            values = sorted(buffer.values())
+            stats[phase] = {
+                "p50": percentile(values, 0.50) / 1e6,
+                "p95": percentile(values, 0.95) / 1e6,
+                "p99": percentile(values, 0.99) / 1e6,
+            }
+        objects = self.objects.values()
+        stats["objects"] = {"last": objects[-1] if objects else 0, "max": max(objects, default=0)}
+        return stats
+
+    def overlay_lines(self):
+        """Text lines for the on-screen overlay"""
+        stats = self.summary()
+        lines = [f"{'phase':<7}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for phase in PHASES + ("frame",):
+            s = stats[phase]
+            lines.append(f"{phase:<7}{s['p50']:>7.2f}{s['p95']:>7.2f}{s['p99']:>7.2f}")
+        lines.append(f"objects {stats['objects']['last']} (max {stats['objects']['max']})")
+        return lines
+
+    def frames(self):
+        """Recorded frames oldest first, as dicts of milliseconds"""
+        columns = {phase: buffer.values() for phase, buffer in self.buffers.items()}
+        objects = self.objects.values()
+        frames = []
+        for i in range(len(objects)):
+            frame = {phase: columns[phase][i] / 1e6 for phase in columns}
+            frame["objects"] = objects[i]
+            frames.append(frame)
+        return frames
+
+    def export(self, path):
+        """Write the recorded frames as CSV, or JSON if path ends in .json"""
+        frames = self.frames()
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(), "frames": frames}, f, indent=1)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(PHASES) + ["frame", "objects"])
+            writer.writeheader()
+            writer.writerows(frames)
+
+
+class GCCounter:
+    """Counts garbage collections per generation while installed"""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+
+    def callback(self, phase, info):
+        if phase == "start":
+            self.collections[info["generation"]] += 1
+
+    def install(self):
+        gc.callbacks.append(self.callback)
+        return self
+
+    def uninstall(self):
+        if self.callback in gc.callbacks:
+            gc.callbacks.remove(self.callback)
+
+    def reset(self):
+        self.collections = [0, 0, 0]
+
+    @property
+    def total(self):
+        return sum(self.collections)
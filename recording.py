@@ -0,0 +1,160 @@
+"""Compact input recordings of played rounds
+
+A round is fully determined by its seed, its difficulty, the object
+container it ran on and the basket x it was given on every tick, so that
+is all a recording keeps. The file is a fixed-size header followed by the
+basket stream as little-endian int16 deltas from the previous tick; when
+the round was not stepped at the simulation's fixed timestep the per-tick
+dt follows as float64. Both arrays sit at fixed offsets, so a recording
+can be memory-mapped and read without parsing.
+
+Layout:
+
+    header   64 bytes, see HEADER
+    deltas   int16[ticks]    basket x minus the previous tick's (start: WIDTH // 2)
+    dts      float64[ticks]  only when FLAG_VARIABLE_DT is set
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+MAGIC = b"CFOR"
+VERSION = 2  # 2: object positions from spawn time, so version 1 rounds play differently
+
+# magic, version, flags, seed, timestep, difficulty, ticks, score, misses, start x
+HEADER = struct.Struct("<4sHHQd16sIiii")
+HEADER_SIZE = 64
+
+FLAG_VARIABLE_DT = 1
+FLAG_ARRAY_STORE = 2
+FLAG_SCHEDULER = 4
+FLAG_TIMELINE = 8
+
+Recording = namedtuple("Recording", ["seed", "difficulty", "timestep", "flags", "ticks",
+                                     "score", "misses", "start_x", "deltas", "dts"])
+
+
+def basket_positions(recording):
+    """Decode the delta stream back into one basket x per tick"""
+    x = recording.start_x
+    for delta in recording.deltas:
+        x += delta
+        yield x
+
+
+def save(path, recording):
+    """Write a recording to path"""
+    deltas = array("h", recording.deltas)
+    dts = array("d", recording.dts or ())
+    flags = recording.flags
+    if recording.dts is not None:
+        flags |= FLAG_VARIABLE_DT
+    if sys.byteorder != "little":
+        deltas.byteswap()
+        dts.byteswap()
+
+    header = HEADER.pack(MAGIC, VERSION, flags, recording.seed, recording.timestep,
+                         recording.difficulty.encode("ascii"), len(deltas),
+                         recording.score, recording.misses, recording.start_x)
+    # Write under a temporary name so a crash never leaves half a recording
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(deltas.tobytes())
+        if flags & FLAG_VARIABLE_DT:
+            f.write(dts.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """Memory-map a recording; deltas and dts are views onto the file"""
+    with open(path, "rb") as f:
+        # mmap cannot map an empty file, so check the size first
+        if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+            raise ValueError(f"{path}: too short to be a recording")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, version, flags, seed, timestep, difficulty, ticks,
+     score, misses, start_x) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} recording")
+    end = HEADER_SIZE + 2 * ticks
+    if flags & FLAG_VARIABLE_DT:
+        end += 8 * ticks
+    if len(data) < end:
+        raise ValueError(f"{path}: truncated recording")
+
+    view = memoryview(data)
+    deltas = view[HEADER_SIZE:HEADER_SIZE + 2 * ticks].cast("h")
+    dts = None
+    if flags & FLAG_VARIABLE_DT:
+        dts = view[HEADER_SIZE + 2 * ticks:end].cast("d")
+    if sys.byteorder != "little":
+        deltas = array("h", deltas)
+        deltas.byteswap()
+        if dts is not None:
+            dts = array("d", dts)
+            dts.byteswap()
+    return Recording(seed, difficulty.rstrip(b"\0").decode("ascii"), timestep,
+                     flags & ~FLAG_VARIABLE_DT, ticks, score, misses, start_x, deltas, dts)
+
+
+def simulation_flags(sim):
+    """Header flags for the object container a simulation runs on"""
+    flags = 0
+    if sim.use_array_store:
+        flags |= FLAG_ARRAY_STORE
+    if sim.use_scheduler:
+        flags |= FLAG_SCHEDULER
+    if sim.use_timeline:
+        flags |= FLAG_TIMELINE
+    return flags
+
+
+class Recorder:
+    """Collects the basket stream of the current round and saves finished ones
+
+    Basket positions are stored as whole pixels, so the game must step the
+    simulation with the rounded value it records.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.sim = None
+        self.deltas = array("h")
+        self.dts = array("d")
+        self.variable_dt = False
+        self.last_x = 0
+
+    def start(self, sim):
+        """Begin recording the round the simulation was just reset to"""
+        self.sim = sim
+        self.deltas = array("h")
+        self.dts = array("d")
+        self.variable_dt = False
+        self.last_x = sim.WIDTH // 2
+
+    def record(self, basket_x, dt):
+        """Add one tick; call with exactly what is passed to sim.step"""
+        self.deltas.append(basket_x - self.last_x)
+        self.last_x = basket_x
+        self.dts.append(dt)
+        if dt != self.sim.timestep:
+            self.variable_dt = True
+
+    def finish(self):
+        """Save the round once it is over; return the file written"""
+        sim = self.sim
+        if sim is None:
+            return None
+        self.sim = None
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{sim.difficulty}-{sim.seed}.cfr"
+        path = os.path.join(self.directory, name)
+        save(path, Recording(sim.seed, sim.difficulty, sim.timestep, simulation_flags(sim),
+                             len(self.deltas), sim.score, sim.misses, sim.WIDTH // 2,
+                             self.deltas, self.dts if self.variable_dt else None))
+        return path
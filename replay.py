@@ -0,0 +1,164 @@
+"""Replay recorded rounds and check they still end with the same result
+
+Headless replays run the simulation as fast as it goes and compare the
+final score and misses against the ones stored in the recording; any
+difference means the engine no longer plays recorded rounds the same way.
+Directories are searched for .cfr files, so a whole collection can be
+validated in one go.
+
+With --capture a recording is rendered to a clip instead, headless and as
+fast as it encodes unless --visual is given as well.
+
+    python replay.py recordings/ --workers 8
+    python replay.py recordings/20240101-120000-Hard-1234.cfr --visual
+    python replay.py recordings/20240101-120000-Hard-1234.cfr --capture clip.gif --every 4
+"""
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import recording
+from simulation import Simulation
+
+
+def make_simulation(rec, **options):
+    return Simulation(rec.difficulty, rec.seed, rec.timestep,
+                      use_array_store=bool(rec.flags & recording.FLAG_ARRAY_STORE),
+                      use_scheduler=bool(rec.flags & recording.FLAG_SCHEDULER),
+                      use_timeline=bool(rec.flags & recording.FLAG_TIMELINE), **options)
+
+
+def replay(path):
+    """Run one recording headless; return (path, ok, recorded, replayed)
+
+    A recording that cannot be read or set up is a failure with recorded
+    None and the error as replayed, so one bad file never stops a batch.
+    """
+    try:
+        rec = recording.load(path)
+        sim = make_simulation(rec)
+    except (ValueError, OSError) as e:
+        return path, False, None, str(e)
+    except KeyError as e:
+        return path, False, None, f"{path}: unknown difficulty {e}"
+    dts = rec.dts
+    for i, basket_x in enumerate(recording.basket_positions(rec)):
+        sim.step(basket_x, dts[i] if dts is not None else None)
+    recorded = (rec.score, rec.misses)
+    replayed = (sim.score, sim.misses)
+    return path, recorded == replayed, recorded, replayed
+
+
+def replay_visual(path, fps=60, capture_path=None, every=None):
+    """Play one recording back on screen at the given frame rate (0 = unthrottled)
+
+    With capture_path, every every-th tick is drawn and captured; by
+    default as many ticks as the output format can play back.
+    """
+    import pygame
+    from capture import FrameCapture, max_fps
+    from catch_falling_objects import CatchGame, FallingObject, StoredFallingObject
+
+    rec = recording.load(path)
+    if every is None:
+        limit = capture_path and max_fps(capture_path)
+        every = math.ceil(1 / (rec.timestep * limit) - 1e-9) if limit else 1
+    game = CatchGame()
+    game.sim = make_simulation(rec, object_class=FallingObject, view_class=StoredFallingObject)
+    game.game_state = "playing"
+    game.wait_for_audio()
+    capture = None
+    if capture_path:
+        capture = FrameCapture(capture_path, (game.WIDTH, game.HEIGHT),
+                               fps=round(1 / (rec.timestep * every)), block=True)
+    clock = pygame.time.Clock()
+    dts = rec.dts
+    for i, basket_x in enumerate(recording.basket_positions(rec)):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return path, False, (rec.score, rec.misses), (game.score, game.misses)
+        game.basket_x = basket_x
+        for _, name in game.sim.step(basket_x, dts[i] if dts is not None else None):
+            game.voices.queue(name)
+        game.voices.flush(game.sounds)
+        if i % every:
+            continue
+        game.draw_playing()
+        if capture:
+            capture.capture(game.screen)
+        pygame.display.flip()
+        clock.tick(fps)
+    recorded = (rec.score, rec.misses)
+    replayed = (game.score, game.misses)
+    if capture:
+        capture.close()
+    pygame.quit()
+    return path, recorded == replayed, recorded, replayed
+
+
+def find_recordings(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(".cfr"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded rounds and verify their scores")
+    parser.add_argument("paths", nargs="+", help="recordings or directories of recordings")
+    parser.add_argument("--visual", action="store_true", help="show the replay on screen")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate for --visual (0 = as fast as possible)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for headless batch validation")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="render a single recording to PNGs in a directory, a .gif or raw .rgb frames")
+    parser.add_argument("--every", type=int,
+                        help="capture every Nth tick (default: every tick the format can play back)")
+    args = parser.parse_args()
+
+    paths = list(find_recordings(args.paths))
+    if args.capture:
+        if len(paths) != 1:
+            parser.error("--capture takes exactly one recording")
+        from capture import check_output
+        try:
+            check_output(args.capture)
+        except RuntimeError as e:
+            parser.error(str(e))
+        if not args.visual:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        fps = args.fps if args.visual else 0
+        results = [replay_visual(paths[0], fps, args.capture, args.every)]
+    elif args.visual:
+        results = (replay_visual(path, args.fps) for path in paths)
+    elif args.workers > 1:
+        pool = ProcessPoolExecutor(args.workers)
+        results = pool.map(replay, paths, chunksize=16)
+    else:
+        results = map(replay, paths)
+
+    failed = 0
+    for path, ok, recorded, replayed in results:
+        if not ok:
+            failed += 1
+            if recorded is None:
+                print(f"ERROR {replayed}")
+                continue
+            print(f"MISMATCH {path}: recorded score {recorded[0]} misses {recorded[1]}, "
+                  f"replayed score {replayed[0]} misses {replayed[1]}")
+    print(f"{len(paths) - failed}/{len(paths)} recordings replayed identically")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
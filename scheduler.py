@@ -0,0 +1,154 @@
+"""Event-driven arrival scheduler for falling objects
+
+Every object falls at a constant speed, so the time it reaches the basket
+band and the time it leaves the screen are known when it spawns. Objects
+wait in priority queues keyed by those times; each tick only the objects
+inside the basket band are hit-tested, and positions are only worked out
+for objects that are being drawn or tested.
+
+Positions are computed from the spawn point and time exactly as
+FallingObject.fall_to and the array store compute them, and an object only
+leaves the band once not even the swept test could catch it any more, so
+every round plays out the same as with the per-frame loop. The queue keys
+are only used to pick candidates, with a little slack either way; each
+candidate is then tested on its exact position.
+"""
+import heapq
+import itertools
+from collections import namedtuple
+
+StepResult = namedtuple("StepResult", ["caught_good", "caught_bad", "missed_good", "missed_bad"])
+
+VISIBLE_TOP = -50  # Objects above this are off screen and not positioned for drawing
+SLACK = 1e-9  # Seconds by which queue keys may be early, to absorb float rounding
+
+
+class ArrivalScheduler:
+    """Falling objects queued by their predicted band entry and exit times"""
+
+    def __init__(self, pool, basket_y, screen_height, band=10):
+        self.pool = pool
+        self.band_top = basket_y - band
+        self.band_bottom = basket_y + band
+        self.screen_height = screen_height
+        self.time = 0.0
+        self.sequence = itertools.count()  # Tie-breaker so the heaps never compare objects
+
+        # Entries are [object, spawn y, spawn time]
+        self.pending = []  # (band entry time, seq, entry) for objects above the band
+        self.near = []  # Entries inside the band
+        self.leaving = []  # (off-screen time, seq, entry) for objects below the band
+
+    def __len__(self):
+        return len(self.pending) + len(self.near) + len(self.leaving)
+
+    def entries(self):
+        for item in self.pending:
+            yield item[2]
+        yield from self.near
+        for item in self.leaving:
+            yield item[2]
+
+    def __iter__(self):
+        """Yield the visible objects with their positions brought up to date"""
+        now = self.time
+        for obj, spawn_y, spawn_time in self.entries():
+            y = spawn_y + obj.speed * (now - spawn_time)
+            if y >= VISIBLE_TOP:
+                obj.y = y
+                yield obj
+
+    def add(self, x, y, speed, object_type, spawn_time=0.0):
+        """Schedule a new falling object, at y at simulation time spawn_time"""
+        obj = self.pool.acquire(x, y, speed, object_type, spawn_time)
+        self.schedule([obj, y, spawn_time])
+
+    def append(self, obj):
+        """Schedule a FallingObject-like instance (list API compatibility)"""
+        self.add(obj.x, obj.spawn_y, obj.speed, obj.type, obj.spawn_time)
+
+    def schedule(self, entry):
+        obj, spawn_y, spawn_time = entry
+        if spawn_y >= self.band_top:
+            self.near.append(entry)
+        else:
+            # Queue slightly early so rounding never makes us test too late
+            enter = spawn_time + (self.band_top - spawn_y) / obj.speed - SLACK
+            heapq.heappush(self.pending, (enter, next(self.sequence), entry))
+
+    def clear(self):
+        for entry in self.entries():
+            self.pool.release(entry[0])
+        self.pending.clear()
+        self.near.clear()
+        self.leaving.clear()
+
+    def step(self, now, dt, basket_x, basket_width, basket_y, screen_height):
+        """Move the clock to time now, resolve catches and misses that fall due
+
+        basket_y and screen_height must match the values the scheduler
+        was created with; they are accepted for ObjectStore compatibility.
+        """
+        self.time = now
+        caught_good = caught_bad = missed_good = missed_bad = 0
+
+        # Objects whose predicted band entry has come
+        pending = self.pending
+        while pending and pending[0][0] <= now:
+            self.near.append(heapq.heappop(pending)[2])
+
+        # Hit-test only the objects in the band, with the per-frame loop's tests in its order
+        left = basket_x - basket_width // 2
+        right = basket_x + basket_width // 2
+        kept = 0
+        near = self.near
+        for i in range(len(near)):
+            entry = near[i]
+            obj, spawn_y, spawn_time = entry
+            y = spawn_y + obj.speed * (now - spawn_time)
+            # Swept test: the path fallen this step only has to touch the band
+            if y >= self.band_top and y - obj.speed * dt <= self.band_bottom and left <= obj.x <= right:
+                obj.y = y
+                obj.caught = True
+                if obj.type == 0:
+                    caught_good += 1
+                else:
+                    caught_bad += 1
+                self.pool.release(obj)
+            elif y > self.screen_height:
+                obj.y = y
+                obj.missed = True
+                if obj.type == 0:
+                    missed_good += 1
+                else:
+                    missed_bad += 1
+                self.pool.release(obj)
+            elif y - obj.speed * dt > self.band_bottom:
+                # Wholly below the band, so no later swept test can reach it;
+                # wait for it to leave the screen
+                gone = spawn_time + (self.screen_height - spawn_y) / obj.speed - SLACK
+                heapq.heappush(self.leaving, (gone, next(self.sequence), entry))
+            else:
+                near[kept] = entry
+                kept += 1
+        del near[kept:]
+
+        # Objects that have gone past the bottom of the screen
+        leaving = self.leaving
+        not_yet = []
+        while leaving and leaving[0][0] <= now:
+            item = heapq.heappop(leaving)
+            obj, spawn_y, spawn_time = item[2]
+            if spawn_y + obj.speed * (now - spawn_time) <= self.screen_height:
+                not_yet.append(item)  # The key was early; look again next step
+                continue
+            obj.missed = True
+            if obj.type == 0:
+                missed_good += 1
+            else:
+                missed_bad += 1
+            self.pool.release(obj)
+        for item in not_yet:
+            heapq.heappush(leaving, item)
+
+        return StepResult(caught_good, caught_bad, missed_good, missed_bad)
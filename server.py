@@ -0,0 +1,271 @@
+"""Authoritative multi-session game server
+
+Hosts many independent rounds in one process. Every session runs the
+headless Simulation with the normal spawn, update and scoring rules; an
+asyncio tick loop steps all of them together at a fixed rate, and clients
+only send basket positions and receive state.
+
+Clients speak newline-delimited JSON over TCP, or the same messages as
+WebSocket text frames when the optional websockets package is installed
+(for the web_game frontend):
+
+    -> {"type": "start", "difficulty": "Hard", "seed": 42, "objects": true}
+    <- {"type": "started", "session": 1, "seed": 42, "tick_rate": 60}
+    -> {"type": "input", "x": 412}
+    <- {"type": "state", "tick": 120, "score": 20, "misses": 1, "remaining": 58.0,
+        "events": ["catch"], "objects": [[x, y, type], ...]}
+    <- {"type": "over", "score": 310, "misses": 4, "ticks": 3600}
+
+Inputs take effect at the next tick; the latest one wins. A client can ask
+for {"type": "metrics"} at any time.
+
+    python server.py --port 8765 --websocket-port 8766
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from profiler import RingBuffer, percentile
+from simulation import Simulation
+
+try:
+    import websockets
+except ImportError:  # The WebSocket endpoint is optional
+    websockets = None
+
+SEND_BUFFER_LIMIT = 64 * 1024  # Bytes queued for a client before its snapshots are dropped
+
+
+class Connection:
+    """One client connection; send() never blocks the tick loop"""
+
+    def __init__(self, write, buffered):
+        self.write = write
+        self.buffered = buffered
+        self.session = None
+
+    def send(self, message, droppable=False):
+        if droppable and self.buffered() > SEND_BUFFER_LIMIT:
+            return  # Slow client; it gets the next snapshot instead
+        self.write(json.dumps(message, separators=(",", ":")))
+
+
+class Session:
+    """One round being played by one connection"""
+
+    __slots__ = ("id", "sim", "connection", "basket_x", "events", "send_objects")
+
+    def __init__(self, session_id, connection, difficulty, seed, timestep, send_objects):
+        self.id = session_id
+        self.connection = connection
+        self.sim = Simulation(difficulty, seed, timestep)
+        self.basket_x = self.sim.basket_x
+        self.events = []  # Event names since the last snapshot
+        self.send_objects = send_objects
+
+    def snapshot(self):
+        sim = self.sim
+        message = {"type": "state", "tick": sim.tick, "score": sim.score, "misses": sim.misses,
+                   "remaining": round(sim.remaining, 3), "events": self.events}
+        if self.send_objects:
+            message["objects"] = [[round(obj.x), round(obj.y), obj.type] for obj in sim.objects]
+        self.events = []
+        return message
+
+
+class GameServer:
+    """Steps every session once per tick and reports how long ticks take"""
+
+    def __init__(self, tick_rate=60, snapshot_rate=20, round_length=None, max_catch_up=5):
+        self.timestep = 1 / tick_rate
+        self.tick_rate = tick_rate
+        self.snapshot_every = max(1, round(tick_rate / snapshot_rate))
+        self.round_length = round_length
+        self.max_catch_up = max_catch_up  # Ticks run back to back before the server drops time
+        self.sessions = {}
+        self.ids = itertools.count(1)
+
+        # Metrics
+        self.tick = 0
+        self.tick_times = RingBuffer(tick_rate * 10)  # ns per tick over the last ten seconds
+        self.overruns = 0  # Ticks that took longer than the timestep
+        self.dropped = 0  # Ticks skipped to get back on schedule
+
+    def open_session(self, connection, difficulty="Medium", seed=None, send_objects=False):
+        if difficulty not in Simulation.DIFFICULTY:
+            raise ValueError(f"unknown difficulty {difficulty!r}")
+        self.close_session(connection)
+        session = Session(next(self.ids), connection, difficulty, seed, self.timestep, send_objects)
+        if self.round_length is not None:
+            session.sim.GAME_DURATION = self.round_length
+        self.sessions[session.id] = session
+        connection.session = session
+        return session
+
+    def close_session(self, connection):
+        if connection.session is not None:
+            self.sessions.pop(connection.session.id, None)
+            connection.session = None
+
+    def handle_message(self, connection, text):
+        """Apply one client message"""
+        try:
+            message = json.loads(text)
+            kind = message["type"]
+            if kind == "input":
+                if connection.session is not None:
+                    connection.session.basket_x = float(message["x"])
+            elif kind == "start":
+                session = self.open_session(connection, message.get("difficulty", "Medium"),
+                                            message.get("seed"), bool(message.get("objects")))
+                connection.send({"type": "started", "session": session.id, "seed": session.sim.seed,
+                                 "tick_rate": self.tick_rate})
+            elif kind == "quit":
+                self.close_session(connection)
+            elif kind == "metrics":
+                connection.send(dict(self.metrics(), type="metrics"))
+            else:
+                raise ValueError(f"unknown message type {kind!r}")
+        except (ValueError, KeyError, TypeError) as e:
+            connection.send({"type": "error", "message": str(e)})
+
+    def step_all(self):
+        """Advance every session by one tick"""
+        self.tick += 1
+        # Sessions take turns to get snapshots so no tick sends them all
+        snapshot_slot = self.tick % self.snapshot_every
+        snapshot_every = self.snapshot_every
+        finished = []
+        for session in self.sessions.values():
+            sim = session.sim
+            events = sim.step(session.basket_x)
+            if events:
+                session.events.extend(name for _, name in events)
+            if sim.game_over:
+                finished.append(session)
+            elif session.id % snapshot_every == snapshot_slot:
+                session.connection.send(session.snapshot(), droppable=True)
+        for session in finished:
+            sim = session.sim
+            session.connection.send({"type": "over", "score": sim.score, "misses": sim.misses,
+                                     "ticks": sim.tick})
+            self.close_session(session.connection)
+
+    async def run(self):
+        """Tick loop on a fixed schedule"""
+        period = self.timestep
+        next_tick = time.perf_counter()
+        while True:
+            start = time.perf_counter_ns()
+            self.step_all()
+            elapsed = time.perf_counter_ns() - start
+            self.tick_times.append(elapsed)
+            if elapsed > period * 1e9:
+                self.overruns += 1
+
+            next_tick += period
+            now = time.perf_counter()
+            if now - next_tick > self.max_catch_up * period:
+                # Too far behind: give up on the missed ticks instead of spiralling
+                missed = int((now - next_tick) / period)
+                self.dropped += missed
+                next_tick += missed * period
+            await asyncio.sleep(max(0.0, next_tick - now))
+
+    def metrics(self):
+        times = sorted(self.tick_times.values())
+        ms = lambda ns: round(ns / 1e6, 3)
+        return {
+            "sessions": len(self.sessions),
+            "tick": self.tick,
+            "tick_ms_p50": ms(percentile(times, 0.50)),
+            "tick_ms_p95": ms(percentile(times, 0.95)),
+            "tick_ms_p99": ms(percentile(times, 0.99)),
+            "tick_ms_max": ms(times[-1] if times else 0),
+            "overruns": self.overruns,
+            "dropped": self.dropped,
+        }
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            m = self.metrics()
+            print(f"sessions {m['sessions']:6d}  tick p50 {m['tick_ms_p50']:7.3f} ms  "
+                  f"p95 {m['tick_ms_p95']:7.3f}  p99 {m['tick_ms_p99']:7.3f}  "
+                  f"max {m['tick_ms_max']:7.3f}  overruns {m['overruns']}  dropped {m['dropped']}",
+                  flush=True)
+
+    async def handle_tcp(self, reader, writer):
+        transport = writer.transport
+        connection = Connection(lambda text: writer.write(text.encode() + b"\n"),
+                                transport.get_write_buffer_size)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.handle_message(connection, line)
+        except ConnectionError:
+            pass
+        finally:
+            self.close_session(connection)
+            writer.close()
+
+    async def handle_websocket(self, websocket, path=None):
+        queue = asyncio.Queue()
+        connection = Connection(queue.put_nowait, lambda: 1024 * queue.qsize())
+
+        async def sender():
+            while True:
+                await websocket.send(await queue.get())
+
+        send_task = asyncio.ensure_future(sender())
+        try:
+            async for text in websocket:
+                self.handle_message(connection, text)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            send_task.cancel()
+            self.close_session(connection)
+
+
+async def serve(args):
+    server = GameServer(args.tick_rate, args.snapshot_rate, args.round_length)
+    tcp = await asyncio.start_server(server.handle_tcp, args.host, args.port)
+    print(f"Listening on {args.host}:{args.port} (TCP)", flush=True)
+    if args.websocket_port:
+        if websockets is None:
+            print("Warning: websockets package not installed, WebSocket endpoint disabled")
+        else:
+            await websockets.serve(server.handle_websocket, args.host, args.websocket_port)
+            print(f"Listening on {args.host}:{args.websocket_port} (WebSocket)", flush=True)
+    tasks = [server.run()]
+    if args.report:
+        tasks.append(server.report(args.report))
+    async with tcp:
+        await asyncio.gather(*tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many game sessions in one process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port for JSON lines")
+    parser.add_argument("--websocket-port", type=int, help="also accept WebSocket clients here")
+    parser.add_argument("--tick-rate", type=int, default=60, help="simulation ticks per second")
+    parser.add_argument("--snapshot-rate", type=float, default=20,
+                        help="state messages per second sent to each client")
+    parser.add_argument("--round-length", type=float, help="seconds per round (default 60)")
+    parser.add_argument("--report", type=float, default=5.0,
+                        help="seconds between tick metric reports (0 = off)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
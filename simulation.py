@@ -0,0 +1,318 @@
+"""Headless, deterministic game simulation
+
+The simulation has no display, no mixer and no wall clock: it is driven by
+a seed, a fixed timestep and a basket x position per tick, so whole rounds
+can be run faster than real time and reproduced exactly.
+"""
+import random
+from collections import namedtuple
+
+from scheduler import ArrivalScheduler
+
+try:
+    from object_store import ObjectStore, ObjectView
+except ImportError:  # NumPy is optional
+    ObjectStore = ObjectView = None
+
+try:
+    from spawns import LEVELS, SpawnTimeline, difficulty_waves
+except ImportError:  # Spawn timelines need NumPy
+    SpawnTimeline = None
+    LEVELS = {}
+
+SimulationResult = namedtuple("SimulationResult", ["score", "misses", "ticks", "events"])
+
+
+class FallingObject:
+    __slots__ = ("x", "y", "speed", "type", "caught", "missed", "spawn_y", "spawn_time")
+    width = 40
+    height = 40
+
+    def __init__(self, x, y, speed, object_type, spawn_time=0.0):
+        self.reset(x, y, speed, object_type, spawn_time)
+
+    def reset(self, x, y, speed, object_type, spawn_time=0.0):
+        """(Re)initialise the object, used when it comes out of the pool"""
+        self.x = x
+        self.y = y
+        self.speed = speed
+        self.type = object_type  # 0 = good, 1 = bad
+        self.caught = False
+        self.missed = False
+        self.spawn_y = y
+        self.spawn_time = spawn_time  # Simulation time at which it was at spawn_y
+
+    def fall_to(self, now):
+        """Move to where the object is at simulation time now
+
+        Positions are worked out from the spawn point rather than added up
+        tick by tick, the same way in every object container, so the
+        container can never change how a round plays out.
+        """
+        self.y = self.spawn_y + self.speed * (now - self.spawn_time)
+
+    def check_caught(self, basket_x, basket_width, basket_y, dt=0.0):
+        """Whether the path fallen over the last dt seconds crossed the basket"""
+        if (self.y >= basket_y - 10 and
+            self.y - self.speed * dt <= basket_y + 10 and
+            self.x >= basket_x - basket_width//2 and
+            self.x <= basket_x + basket_width//2):
+            return True
+        return False
+
+    def check_missed(self, screen_height):
+        if self.y > screen_height:
+            return True
+        return False
+
+
+class ObjectPool:
+    """Free list of falling objects, so steady-state play allocates none"""
+
+    def __init__(self, object_class):
+        self.object_class = object_class
+        self.free = []
+        self.allocated = 0  # Objects ever created
+        self.reused = 0  # Acquisitions served from the free list
+
+    def acquire(self, x, y, speed, object_type, spawn_time=0.0):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(x, y, speed, object_type, spawn_time)
+            self.reused += 1
+            return obj
+        self.allocated += 1
+        return self.object_class(x, y, speed, object_type, spawn_time)
+
+    def release(self, obj):
+        self.free.append(obj)
+
+
+class Simulation:
+    # Constants
+    WIDTH, HEIGHT = 800, 600
+    GAME_DURATION = 60  # Game lasts 60 seconds
+    GOOD_CHANCE = 0.7  # 70% chance for good objects
+    SPAWN_Y = -20  # Objects start above the screen
+    BASKET_WIDTH = 100
+    BASKET_Y = HEIGHT - 50
+
+    # Difficulty settings
+    DIFFICULTY = {
+        "Easy": {"spawn_rate": 1.5, "speed_range": (100, 200)},
+        "Medium": {"spawn_rate": 1.0, "speed_range": (150, 250)},
+        "Hard": {"spawn_rate": 0.7, "speed_range": (200, 300)}
+    }
+
+    def __init__(self, difficulty="Medium", seed=None, timestep=1 / 60,
+                 object_class=FallingObject, use_array_store=False, view_class=None,
+                 use_scheduler=False, use_timeline=False):
+        self.timestep = timestep
+        self.object_class = object_class
+        self.pool = ObjectPool(object_class)
+        self.objects = []
+        self.use_array_store = use_array_store and ObjectStore is not None
+        self.view_class = view_class or ObjectView
+        self.use_scheduler = use_scheduler and not self.use_array_store
+        # Containers with their own batched step() instead of the object loop
+        self.batched = self.use_array_store or self.use_scheduler
+        # Spawn from a precomputed timeline rather than one object per interval;
+        # scripted levels always do
+        self.use_timeline = use_timeline and SpawnTimeline is not None
+        self.timeline = None
+
+        # Player's basket
+        self.basket_width = self.BASKET_WIDTH
+        self.basket_y = self.BASKET_Y
+        self.basket_x = self.WIDTH // 2
+
+        self.reset(difficulty, seed)
+
+    def reset(self, difficulty=None, seed=None):
+        """Start a new round"""
+        if difficulty is not None:
+            self.difficulty = difficulty
+        # Always keep a concrete seed so the round can be reproduced
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+
+        self.score = 0
+        self.misses = 0
+        self.good_chance = self.GOOD_CHANCE
+        self.tick = 0
+        self.time = 0.0
+        self.last_spawn_time = 0.0
+        self.game_over = False
+        if self.use_array_store:
+            self.objects = ObjectStore(view_class=self.view_class)
+        elif self.use_scheduler:
+            if isinstance(self.objects, ArrivalScheduler):
+                self.objects.clear()
+            self.objects = ArrivalScheduler(self.pool, self.basket_y, self.HEIGHT)
+        else:
+            # Hand the previous round's objects back for reuse
+            for obj in self.objects:
+                self.pool.release(obj)
+            self.objects.clear()
+
+        if self.difficulty in LEVELS:
+            self.timeline = SpawnTimeline(LEVELS[self.difficulty], self.seed, self.WIDTH,
+                                          self.GAME_DURATION, self.good_chance)
+            self.spawn_rate = float("inf")
+            self.speed_range = None
+            return
+
+        # Set difficulty parameters
+        self.spawn_rate = self.DIFFICULTY[self.difficulty]["spawn_rate"]
+        self.speed_range = self.DIFFICULTY[self.difficulty]["speed_range"]
+        self.timeline = None
+        if self.use_timeline:
+            self.timeline = SpawnTimeline(difficulty_waves(self.DIFFICULTY[self.difficulty], self.GAME_DURATION),
+                                          self.seed, self.WIDTH, self.GAME_DURATION, self.good_chance)
+
+    @property
+    def remaining(self):
+        """Seconds left in the round"""
+        return max(0, self.GAME_DURATION - self.time)
+
+    def spawn_object(self, spawn_time=None):
+        """Spawn a new falling object, at the top of the screen at spawn_time (default: now)"""
+        x = self.rng.randint(50, self.WIDTH - 50)
+        speed = self.rng.randint(self.speed_range[0], self.speed_range[1])
+        object_type = 0 if self.rng.random() < self.good_chance else 1
+        self.add_object(x, self.SPAWN_Y, speed, object_type,
+                        self.time if spawn_time is None else spawn_time)
+
+    def add_object(self, x, y, speed, object_type, spawn_time):
+        if self.batched:
+            self.objects.add(x, y, speed, object_type, spawn_time)
+        else:
+            self.objects.append(self.pool.acquire(x, y, speed, object_type, spawn_time))
+
+    def release_spawns(self):
+        """Spawn every timeline entry that has fallen due
+
+        Each is placed at the top of the screen at its own spawn time, so
+        it is as far down as it would be had it spawned exactly on time.
+        """
+        timeline = self.timeline
+        due = timeline.due(self.time)
+        if self.use_array_store:
+            if due:
+                s = slice(due.start, due.stop)
+                self.objects.add_many(timeline.x[s], self.SPAWN_Y, timeline.speed[s],
+                                      timeline.type[s], timeline.times[s])
+            return
+        for i in due:
+            self.add_object(timeline.x[i], self.SPAWN_Y, timeline.speed[i], timeline.type[i],
+                            timeline.times[i])
+
+    def step(self, basket_x, dt=None):
+        """Advance one tick and return the list of (tick, event) tuples
+
+        Events are "catch", "bad_catch" and "miss", named after the sound
+        the game plays for them.
+        """
+        if self.game_over:
+            return []
+        if dt is None:
+            dt = self.timestep
+        self.tick += 1
+        start = self.time
+        self.time += dt
+
+        # Check if game is over
+        if self.time >= self.GAME_DURATION:
+            self.game_over = True
+            return []
+
+        self.basket_x = basket_x
+
+        # Spawn new objects
+        if self.timeline is not None:
+            self.release_spawns()
+        elif self.time - self.last_spawn_time > self.spawn_rate:
+            self.spawn_object(start)  # Falls for this whole step, like everything else
+            self.last_spawn_time = self.time
+
+        if self.batched:
+            return self.step_object_store(dt)
+
+        # Update falling objects, compacting survivors in the same pass
+        events = []
+        objects = self.objects
+        pool = self.pool
+        now = self.time
+        kept = 0
+        for i in range(len(objects)):
+            obj = objects[i]
+            obj.fall_to(now)
+
+            # Check if object is caught
+            if not obj.caught and not obj.missed and obj.check_caught(self.basket_x, self.basket_width, self.basket_y, dt):
+                obj.caught = True
+                if obj.type == 0:  # Good object
+                    self.score += 10
+                    events.append((self.tick, "catch"))
+                else:  # Bad object
+                    self.score -= 5
+                    events.append((self.tick, "bad_catch"))
+                pool.release(obj)
+
+            # Check if object is missed
+            elif not obj.caught and not obj.missed and obj.check_missed(self.HEIGHT):
+                obj.missed = True
+                if obj.type == 0:  # Only count misses for good objects
+                    self.misses += 1
+                    events.append((self.tick, "miss"))
+                pool.release(obj)
+
+            else:
+                objects[kept] = obj
+                kept += 1
+
+        # Drop caught or missed objects from the tail in one go
+        del objects[kept:]
+        return events
+
+    def step_object_store(self, dt):
+        """Update falling objects held in the array store or the scheduler"""
+        result = self.objects.step(self.time, dt, self.basket_x, self.basket_width, self.basket_y,
+                                   self.HEIGHT)
+
+        self.score += 10 * result.caught_good - 5 * result.caught_bad
+        self.misses += result.missed_good
+
+        return ([(self.tick, "catch")] * result.caught_good +
+                [(self.tick, "bad_catch")] * result.caught_bad +
+                [(self.tick, "miss")] * result.missed_good)
+
+    def run(self, inputs, record_events=True):
+        """Play until the round ends or the basket x stream runs out
+
+        inputs is an iterable of basket x positions, one per tick, or a
+        policy callable that is asked for the next position with the
+        simulation as its only argument.
+        """
+        if callable(inputs):
+            policy = inputs
+            inputs = iter(lambda: policy(self), None)
+        events = []
+        for basket_x in inputs:
+            tick_events = self.step(basket_x)
+            if record_events:
+                events.extend(tick_events)
+            if self.game_over:
+                break
+        return SimulationResult(self.score, self.misses, self.tick, events)
+
+
+def simulate(difficulty="Medium", seed=0, inputs=None, timestep=1 / 60, **options):
+    """Run one full round headless and return its SimulationResult
+
+    Without an input stream the basket stays in the middle of the screen.
+    """
+    sim = Simulation(difficulty, seed, timestep, **options)
+    if inputs is None:
+        inputs = lambda sim: sim.WIDTH // 2
+    return sim.run(inputs)
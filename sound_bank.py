@@ -0,0 +1,87 @@
+"""Sound effects synthesized straight into mixer buffers
+
+Effects are described by their synthesis parameters and built in memory,
+so loading them needs no files at all. An optional cache directory keeps
+the rendered WAVs under a hash of those parameters; a cached file is only
+reused when it was made from exactly the same parameters.
+"""
+import hashlib
+import io
+import json
+import os
+
+import pygame
+
+import synth
+
+# Sound effects: name -> synthesis parameters
+EFFECTS = {
+    "catch": {"frequency": 600, "duration": 0.15, "volume": 0.8},
+    "miss": {"frequency": 200, "duration": 0.2, "volume": 0.5},
+    "bad_catch": {"frequency": 300, "duration": 0.3, "volume": 0.7},
+}
+
+# Bump when synth output changes so old cache files stop matching
+SYNTH_VERSION = 1
+
+
+def params_hash(params, sample_rate=synth.SAMPLE_RATE):
+    """Stable hash of the synthesis parameters of one sound"""
+    key = json.dumps({"params": params, "sample_rate": sample_rate, "version": SYNTH_VERSION},
+                     sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def mixer_buffer(samples, channels):
+    """Signed 16-bit PCM interleaved for the given number of channels"""
+    if synth.np is not None:
+        pcm = synth.np.asarray(samples).astype(synth.np.int16)
+        if channels > 1:
+            pcm = synth.np.repeat(pcm, channels)
+        return pcm.tobytes()
+    if channels > 1:
+        samples = [s for s in samples for _ in range(channels)]
+    return synth.pcm_bytes(samples)
+
+
+def make_sound(params):
+    """Synthesize one effect into a pygame Sound without touching the disk"""
+    frequency, fmt, channels = pygame.mixer.get_init()
+    if fmt == -16:
+        samples = synth.tone(params["frequency"], params["duration"], params["volume"],
+                             sample_rate=frequency)
+        return pygame.mixer.Sound(buffer=mixer_buffer(samples, channels))
+    # Any other mixer format: let SDL convert from an in-memory WAV
+    samples = synth.tone(params["frequency"], params["duration"], params["volume"])
+    return pygame.mixer.Sound(file=io.BytesIO(synth.wav_bytes(samples)))
+
+
+class SoundBank:
+    """Builds the game's sound effects, optionally through a disk cache"""
+
+    def __init__(self, effects=EFFECTS, cache_dir=None):
+        self.effects = effects
+        self.cache_dir = cache_dir
+
+    def cache_path(self, name, params):
+        return os.path.join(self.cache_dir, f"{name}-{params_hash(params)}.wav")
+
+    def load(self, name):
+        """Return the Sound for one effect"""
+        params = self.effects[name]
+        if not self.cache_dir:
+            return make_sound(params)
+
+        path = self.cache_path(name, params)
+        if os.path.exists(path):
+            return pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            samples = synth.tone(params["frequency"], params["duration"], params["volume"])
+            # Write under a temporary name so a partial file never matches
+            tmp_path = path + ".tmp"
+            synth.write_wav(tmp_path, samples)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # Read-only or unavailable cache; memory is enough
+        return make_sound(params)
@@ -0,0 +1,112 @@
+"""Precomputed spawn timelines
+
+A round's spawns are generated up front from its seed: the time, x,
+speed and type of every object, in one batch of NumPy draws. The round
+then only moves a cursor along the timeline each tick and releases every
+spawn whose time has passed, however many that is. Objects released late
+(several spawns can fall due within one tick) start as far down as they
+would have fallen since their spawn time, so the round plays out the same
+at any tick rate.
+
+A timeline is scripted as a list of waves and bursts:
+
+    {"start": 0, "end": 30, "spawn_rate": 1.2, "end_spawn_rate": 0.5,
+     "speed_range": (150, 250)}
+        one spawn every spawn_rate seconds, the interval changing linearly
+        to end_spawn_rate (default: the same) by the end of the wave
+
+    {"at": 45, "burst": 20, "spread": 0.5, "speed_range": (250, 350)}
+        burst objects spread evenly over spread seconds from at
+
+Either may set its own "good_chance"; the default is Simulation's.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+# Scripted levels, playable as difficulties by name
+LEVELS = {
+    "Ramp": [
+        {"start": 0, "end": 20, "spawn_rate": 1.5, "end_spawn_rate": 0.8, "speed_range": (100, 200)},
+        {"start": 20, "end": 40, "spawn_rate": 0.8, "end_spawn_rate": 0.5, "speed_range": (150, 250)},
+        {"at": 39, "burst": 8, "spread": 1.0, "speed_range": (150, 250)},
+        {"start": 40, "end": 60, "spawn_rate": 0.5, "end_spawn_rate": 0.25, "speed_range": (200, 300)},
+    ],
+    "Stress": [
+        {"start": 0, "end": 60, "spawn_rate": 0.004, "speed_range": (100, 300)},
+    ],
+}
+
+
+def difficulty_waves(settings, duration):
+    """A single steady wave matching one of Simulation.DIFFICULTY's presets"""
+    return [{"start": 0, "end": duration, "spawn_rate": settings["spawn_rate"],
+             "speed_range": settings["speed_range"]}]
+
+
+def wave_times(wave, duration):
+    """Spawn times of one wave
+
+    With the interval running linearly from a to b, spawns come at the
+    rate 1 / interval(t), so the n-th is where the integral of that rate
+    reaches n, which has a closed form.
+    """
+    start = wave["start"]
+    end = min(wave["end"], duration)
+    a = wave["spawn_rate"]
+    b = wave.get("end_spawn_rate", a)
+    if end <= start:
+        return np.empty(0)
+    k = (b - a) / (end - start)  # Interval change per second
+    if abs(k) < 1e-12:
+        n = np.arange(1, int((end - start) / a + 1e-9) + 1)
+        times = start + a * n
+    else:
+        n = np.arange(1, int(np.log(b / a) / k + 1e-9) + 1)
+        times = start + a * np.expm1(k * n) / k
+    return times[times < duration]  # The round ends at duration
+
+
+def burst_times(burst, duration):
+    times = burst["at"] + burst.get("spread", 0.0) * np.arange(burst["burst"]) / burst["burst"]
+    return times[times < duration]
+
+
+class SpawnTimeline:
+    """Every spawn of a round, sorted by time, released by a moving cursor"""
+
+    def __init__(self, waves, seed, width, duration, good_chance):
+        rng = np.random.default_rng(seed)
+        times = [np.empty(0)]
+        xs, speeds, types = [np.empty(0, np.int64)], [np.empty(0, np.int64)], [np.empty(0, np.int64)]
+        for wave in waves:
+            t = burst_times(wave, duration) if "burst" in wave else wave_times(wave, duration)
+            low, high = wave["speed_range"]
+            times.append(t)
+            xs.append(rng.integers(50, width - 50, len(t), endpoint=True))
+            speeds.append(rng.integers(low, high, len(t), endpoint=True))
+            types.append((rng.random(len(t)) >= wave.get("good_chance", good_chance)).astype(np.int64))
+
+        t = np.concatenate(times)
+        order = np.argsort(t, kind="stable")
+        # Plain lists: the per-tick release loop is faster on Python numbers
+        self.times = t[order].tolist()
+        self.x = np.concatenate(xs)[order].tolist()
+        self.speed = np.concatenate(speeds)[order].tolist()
+        self.type = np.concatenate(types)[order].tolist()
+        self.cursor = 0
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def remaining(self):
+        """Spawns not released yet"""
+        return len(self.times) - self.cursor
+
+    def due(self, now):
+        """Move the cursor past every spawn at or before now; returns their indices"""
+        start = self.cursor
+        if start < len(self.times) and self.times[start] <= now:
+            self.cursor = bisect_right(self.times, now, start)
+        return range(start, self.cursor)
@@ -0,0 +1,184 @@
+"""Pre-rendered sprites for falling objects and the basket
+
+Each sprite is drawn once with pygame.draw primitives into a per-pixel
+alpha surface and cached by kind, size and quality level. A frame then
+draws every falling object with a single Surface.blits call.
+
+Lower quality levels (see governor.py) are cheaper to blit: medium drops
+decorative detail and uses a colour key instead of per-pixel alpha, low
+draws plain opaque squares.
+"""
+import pygame
+
+from governor import HIGH, MEDIUM
+
+OBJECT_SIZE = 40
+
+
+def draw_apple(surface, x, y, detail=True):
+    """Draw an apple centred on (x, y)"""
+    color = (255, 0, 0)  # Red
+    pygame.draw.circle(surface, color, (int(x), int(y)), 20)
+    if not detail:
+        return
+    # Draw stem
+    pygame.draw.rect(surface, (101, 67, 33), (int(x - 2), int(y - 25), 4, 10))
+    # Draw leaf
+    pygame.draw.ellipse(surface, (0, 128, 0), (int(x + 2), int(y - 25), 10, 6))
+
+
+def draw_rock(surface, x, y, detail=True):
+    """Draw a rock centred on (x, y)"""
+    color = (100, 100, 100)  # Gray
+    pygame.draw.circle(surface, color, (int(x), int(y)), 20)
+    if not detail:
+        return
+    # Add some texture to the rock
+    for i in range(3):
+        pygame.draw.circle(surface, (80, 80, 80),
+                           (int(x - 5 + i*10), int(y - 5)), 5)
+
+
+def draw_basket(surface, x, y, width, height, handle=True):
+    """Draw a basket centred on (x, y), with its handle above"""
+    basket_rect = pygame.Rect(x - width // 2, y - height // 2, width, height)
+
+    # Draw basket body (brown)
+    pygame.draw.rect(surface, (139, 69, 19), basket_rect, 0, 5)
+
+    # Draw basket rim
+    pygame.draw.rect(surface, (101, 67, 33),
+                     (basket_rect.left, basket_rect.top, basket_rect.width, 10), 0, 5)
+
+    if not handle:
+        return
+
+    # Draw basket handle
+    handle_height = 20
+    handle_width = width // 2
+    handle_rect = pygame.Rect(x - handle_width // 2, y - height // 2 - handle_height,
+                              handle_width, handle_height)
+    pygame.draw.rect(surface, (101, 67, 33), handle_rect, 3, 5)
+
+
+# Sprite kinds: name -> (draw function, surface size, anchor within it,
+# flat colour for the low quality level). The anchor is the point the draw
+# function centres on and the point that ends up at the object's (x, y).
+# Add new object types here.
+SPRITES = {
+    "apple": (draw_apple, (42, 47), (21, 26), (255, 0, 0)),
+    "rock": (draw_rock, (42, 42), (21, 21), (100, 100, 100)),
+}
+
+COLOR_KEY = (255, 0, 255)  # Transparent colour of medium quality sprites
+
+# FallingObject.type -> sprite kind
+OBJECT_SPRITES = {0: "apple", 1: "rock"}
+
+
+class SpriteCache:
+    """Sprites rendered once and kept per (kind, size, quality)"""
+
+    def __init__(self, quality=HIGH):
+        self.sprites = {}
+        self.quality = quality  # Level new lookups are served at
+
+    def render(self, kind, size, quality=HIGH):
+        """Render a sprite; returns (surface, anchor)"""
+        if kind == "basket":
+            width, height = size
+            handle_height = 20
+            surface = pygame.Surface((width, height + handle_height), pygame.SRCALPHA)
+            anchor = (width // 2, height // 2 + handle_height)
+            draw_basket(surface, anchor[0], anchor[1], width, height, handle=quality == HIGH)
+        elif quality > MEDIUM:
+            # Opaque square, the cheapest thing to blit
+            color = SPRITES[kind][3]
+            surface = pygame.Surface((size * 3 // 4, size * 3 // 4))
+            surface.fill(color)
+            anchor = (size * 3 // 8, size * 3 // 8)
+            try:
+                surface = surface.convert()
+            except pygame.error:
+                pass  # No display mode set yet
+            return surface, anchor
+        elif quality == MEDIUM:
+            # Colour-keyed without detail: no per-pixel blending
+            draw, surface_size, anchor = SPRITES[kind][:3]
+            surface = pygame.Surface(surface_size)
+            surface.fill(COLOR_KEY)
+            draw(surface, anchor[0], anchor[1], detail=False)
+            if size != OBJECT_SIZE:
+                scale = size / OBJECT_SIZE
+                surface = pygame.transform.scale(
+                    surface, (round(surface_size[0] * scale), round(surface_size[1] * scale)))
+                anchor = (round(anchor[0] * scale), round(anchor[1] * scale))
+            try:
+                surface = surface.convert()
+            except pygame.error:
+                pass  # No display mode set yet
+            surface.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+            return surface, anchor
+        else:
+            draw, surface_size, anchor = SPRITES[kind][:3]
+            surface = pygame.Surface(surface_size, pygame.SRCALPHA)
+            draw(surface, anchor[0], anchor[1])
+            if size != OBJECT_SIZE:
+                scale = size / OBJECT_SIZE
+                surface = pygame.transform.smoothscale(
+                    surface, (round(surface_size[0] * scale), round(surface_size[1] * scale)))
+                anchor = (round(anchor[0] * scale), round(anchor[1] * scale))
+        try:
+            surface = surface.convert_alpha()
+        except pygame.error:
+            pass  # No display mode set yet
+        # Sprites are mostly fully opaque or fully transparent, which
+        # run-length encoding blits much faster
+        surface.set_alpha(255, pygame.RLEACCEL)
+        return surface, anchor
+
+    def get(self, kind, size=OBJECT_SIZE):
+        key = (kind, size, self.quality)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self.render(kind, size, self.quality)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+    def object_blits(self, objects, size=OBJECT_SIZE, lag=0.0):
+        """Build the (surface, position) sequence for a set of falling objects
+
+        With a lag, objects are drawn where they were that many seconds
+        before their current position, for interpolating between steps.
+        """
+        sprites = {}
+        for object_type, kind in OBJECT_SPRITES.items():
+            surface, (ax, ay) = self.get(kind, size)
+            sprites[object_type] = (surface, ax, ay)
+
+        # Array-backed store: read positions straight from its arrays
+        store_types = getattr(objects, "type", None)
+        if store_types is not None:
+            n = len(objects)
+            xs = objects.x[:n].astype(int).tolist()
+            ys = objects.y[:n]
+            if lag:
+                ys = ys - objects.speed[:n] * lag
+            ys = ys.astype(int).tolist()
+            blits = []
+            for object_type, x, y in zip(store_types[:n].tolist(), xs, ys):
+                surface, ax, ay = sprites[object_type]
+                blits.append((surface, (x - ax, y - ay)))
+            return blits
+
+        blits = []
+        for obj in objects:
+            surface, ax, ay = sprites[obj.type]
+            blits.append((surface, (int(obj.x) - ax, int(obj.y - obj.speed * lag) - ay)))
+        return blits
+
+    def draw_basket(self, screen, x, y, width, height):
+        surface, (ax, ay) = self.get("basket", (width, height))
+        return screen.blit(surface, (int(x) - ax, int(y) - ay))
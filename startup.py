@@ -0,0 +1,40 @@
+"""Per-phase timing of game startup, for --startup-profile"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records when each startup phase began and ended
+
+    Phases may run on other threads (audio loads in the background), so
+    recording is guarded by a lock.
+    """
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []  # (name, begin, end) in perf_counter seconds
+        self.lock = threading.Lock()
+        self.reported = False
+
+    def record(self, name, begin, end=None):
+        with self.lock:
+            self.phases.append((name, begin, end if end is not None else time.perf_counter()))
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, begin)
+
+    def report(self, file=sys.stderr):
+        """Print each phase's duration and when it finished"""
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        print("Startup profile (ms)       took   done at", file=file)
+        for name, begin, end in phases:
+            print(f"  {name:<20} {(end - begin) * 1000:8.1f} {(end - self.start) * 1000:9.1f}", file=file)
+        self.reported = True
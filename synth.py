@@ -0,0 +1,158 @@
+"""Vectorized sound synthesis
+
+Oscillators, note sequences, bass lines and envelopes are computed as
+whole NumPy arrays and written as 16-bit mono PCM in one buffer write.
+Without NumPy the same signals are built with the stdlib array module.
+
+Samples are truncated towards zero at the same points as the original
+per-sample generators, so the output matches them.
+
+Music is described declaratively (melody notes and tempo, bass pattern,
+envelope) and every sample depends only on its own time, so long tracks
+can be rendered in fixed-size chunks and streamed to disk with memory use
+that does not grow with the duration.
+"""
+import io
+import math
+import wave
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+SAMPLE_RATE = 44100
+CHUNK_SAMPLES = 65536  # Samples rendered at a time when streaming
+
+
+def time_axis(duration, sample_rate=SAMPLE_RATE):
+    """Sample times in seconds for a clip of the given duration"""
+    return sample_times(0, int(duration * sample_rate), sample_rate)
+
+
+def sample_times(start, stop, sample_rate=SAMPLE_RATE):
+    """Times in seconds of samples start..stop-1"""
+    if np is not None:
+        return np.arange(start, stop) / sample_rate
+    return [i / sample_rate for i in range(start, stop)]
+
+
+def tone(frequency, duration, volume=1.0, sample_rate=SAMPLE_RATE):
+    """A plain sine wave at the given volume (1.0 = full scale)"""
+    t = time_axis(duration, sample_rate)
+    amplitude = 32767.0 * volume
+    if np is not None:
+        return np.trunc(amplitude * np.sin(2 * np.pi * frequency * t))
+    return [int(amplitude * math.sin(2 * math.pi * frequency * x)) for x in t]
+
+
+def melody(t, notes, notes_per_second, octave_drop_rate=None, amplitude=10000):
+    """Step through notes at a fixed rate
+
+    With octave_drop_rate, the first of every four steps at that rate is
+    played an octave down.
+    """
+    if np is not None:
+        freq = np.asarray(notes)[(t * notes_per_second % len(notes)).astype(int)]
+        if octave_drop_rate:
+            freq = np.where((t * octave_drop_rate).astype(int) % 4 == 0, freq * 0.5, freq)
+        return np.trunc(amplitude * np.sin(2 * np.pi * freq * t))
+
+    samples = []
+    for x in t:
+        freq = notes[int((x * notes_per_second) % len(notes))]
+        if octave_drop_rate and int(x * octave_drop_rate) % 4 == 0:
+            freq *= 0.5
+        samples.append(int(amplitude * math.sin(2 * math.pi * freq * x)))
+    return samples
+
+
+def bass_line(t, base_frequency, steps_per_second, steps, amplitude=5000):
+    """Cycle the bass through 1x..steps x the base frequency"""
+    if np is not None:
+        freq = base_frequency * (1 + (t * steps_per_second).astype(int) % steps)
+        return np.trunc(amplitude * np.sin(2 * np.pi * freq * t))
+    return [int(amplitude * math.sin(2 * math.pi * base_frequency * (1 + int(x * steps_per_second) % steps) * x))
+            for x in t]
+
+
+def fade_envelope(t, duration, fade=2.0):
+    """Fade in and out over the given number of seconds to avoid clicks"""
+    if np is not None:
+        return np.minimum(1.0, np.minimum((duration - t) / fade, t / fade))
+    return [min(1.0, (duration - x) / fade, x / fade) for x in t]
+
+
+def track(notes, notes_per_second, bass_frequency, bass_rate, bass_steps,
+          octave_drop_rate=None, fade=2.0):
+    """Track description for a melody over a cycling bass line"""
+    return {
+        "melody": {"notes": notes, "notes_per_second": notes_per_second,
+                   "octave_drop_rate": octave_drop_rate},
+        "bass": {"frequency": bass_frequency, "steps_per_second": bass_rate, "steps": bass_steps},
+        "envelope": {"fade": fade},
+    }
+
+
+def render(description, duration, t):
+    """Samples of a track description at the sample times t
+
+    duration is the length of the whole track, which the envelope needs
+    even when t only covers part of it.
+    """
+    lead_params = description["melody"]
+    bass_params = description["bass"]
+    lead = melody(t, lead_params["notes"], lead_params["notes_per_second"],
+                  lead_params.get("octave_drop_rate"), lead_params.get("amplitude", 10000))
+    bass = bass_line(t, bass_params["frequency"], bass_params["steps_per_second"],
+                     bass_params["steps"], bass_params.get("amplitude", 5000))
+    envelope = fade_envelope(t, duration, description.get("envelope", {}).get("fade", 2.0))
+    if np is not None:
+        return np.trunc((lead + bass) * envelope)
+    return [int((a + b) * e) for a, b, e in zip(lead, bass, envelope)]
+
+
+def render_chunks(description, duration, chunk_samples=CHUNK_SAMPLES, sample_rate=SAMPLE_RATE):
+    """Yield a track in consecutive blocks of at most chunk_samples samples"""
+    num_samples = int(duration * sample_rate)
+    for start in range(0, num_samples, chunk_samples):
+        t = sample_times(start, min(start + chunk_samples, num_samples), sample_rate)
+        yield render(description, duration, t)
+
+
+def music(duration, notes, notes_per_second, bass_frequency, bass_rate, bass_steps,
+          octave_drop_rate=None, sample_rate=SAMPLE_RATE):
+    """A melody over a bass line with a fade in and out"""
+    description = track(notes, notes_per_second, bass_frequency, bass_rate, bass_steps,
+                        octave_drop_rate)
+    return render(description, duration, time_axis(duration, sample_rate))
+
+
+def pcm_bytes(samples):
+    """Pack samples as native 16-bit PCM"""
+    if np is not None and isinstance(samples, np.ndarray):
+        return samples.astype(np.int16).tobytes()
+    return array("h", samples).tobytes()
+
+
+def write_wav(target, samples, sample_rate=SAMPLE_RATE):
+    """Write samples as a mono 16-bit WAV to a filename or file object"""
+    write_wav_chunks(target, [samples], sample_rate)
+
+
+def write_wav_chunks(target, chunks, sample_rate=SAMPLE_RATE):
+    """Write an iterable of sample blocks as one mono 16-bit WAV, block by block"""
+    with wave.open(target, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        for samples in chunks:
+            wf.writeframes(pcm_bytes(samples))
+
+
+def wav_bytes(samples, sample_rate=SAMPLE_RATE):
+    """Return samples as the contents of a WAV file"""
+    buf = io.BytesIO()
+    write_wav(buf, samples, sample_rate)
+    return buf.getvalue()
@@ -0,0 +1,276 @@
+"""Monte-Carlo difficulty tuner
+
+Plays many headless rounds with scripted basket policies over a grid or a
+random sample of difficulty parameters, spread over a process pool, and
+reports score and miss distributions per parameter set together with the
+candidates that come closest to the target miss counts per preset.
+
+Completed jobs are appended to a checkpoint file as they finish, so an
+interrupted sweep picks up where it stopped when run again with the same
+arguments.
+
+Example:
+
+    python tuner.py --search random --samples 200 --games 2000 \\
+        --checkpoint sweep.ckpt --output sweep.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulation import Simulation
+
+# Expected misses per round for the reference policy
+TARGETS = {"Easy": 2.0, "Medium": 5.0, "Hard": 10.0}
+
+GRID = {
+    "spawn_rate": [0.4, 0.5, 0.6, 0.7, 0.85, 1.0, 1.25, 1.5, 2.0],
+    "speed_min": [100, 150, 200, 250],
+    "speed_span": [50, 100, 150],
+    "good_chance": [0.6, 0.7, 0.8],
+}
+
+RANDOM_RANGES = {
+    "spawn_rate": (0.3, 2.0),
+    "speed_min": (80, 300),
+    "speed_span": (0, 200),
+    "good_chance": (0.5, 0.9),
+}
+
+
+def make_policy(name, seed):
+    """Create a scripted basket policy: a callable taking the simulation"""
+    rng = random.Random(seed)
+
+    if name == "idle":
+        return lambda sim: sim.WIDTH // 2
+
+    if name == "random":
+        def random_walk(sim):
+            return min(sim.WIDTH, max(0, sim.basket_x + rng.uniform(-15, 15)))
+        return random_walk
+
+    # "follow" chases the lowest apple it can still reach; "casual" does the
+    # same with a slower hand and a late reaction
+    max_speed, reaction = {"follow": (900, 0.0), "casual": (450, 0.25)}[name]
+
+    def chase(sim):
+        best = None
+        for obj in sim.objects:
+            if obj.type != 0 or obj.y > sim.basket_y + 10:
+                continue
+            if obj.y < sim.basket_y * reaction:
+                continue
+            if best is None or obj.y > best.y:
+                best = obj
+        if best is None:
+            return sim.basket_x
+        step = max_speed * sim.timestep
+        return sim.basket_x + max(-step, min(step, best.x - sim.basket_x))
+
+    return chase
+
+
+def preset_candidates():
+    """The shipped DIFFICULTY presets as candidate parameter sets"""
+    for name, preset in Simulation.DIFFICULTY.items():
+        low, high = preset["speed_range"]
+        yield {"name": f"preset:{name}", "spawn_rate": preset["spawn_rate"],
+               "speed_min": low, "speed_span": high - low,
+               "good_chance": Simulation.GOOD_CHANCE}
+
+
+def grid_candidates():
+    keys = list(GRID)
+    for values in itertools.product(*(GRID[key] for key in keys)):
+        candidate = dict(zip(keys, values))
+        candidate["name"] = "grid:" + ",".join(str(v) for v in values)
+        yield candidate
+
+
+def random_candidates(samples, seed):
+    rng = random.Random(seed)
+    for i in range(samples):
+        candidate = {key: rng.uniform(low, high) for key, (low, high) in RANDOM_RANGES.items()}
+        candidate["spawn_rate"] = round(candidate["spawn_rate"], 3)
+        candidate["speed_min"] = int(candidate["speed_min"])
+        candidate["speed_span"] = int(candidate["speed_span"])
+        candidate["good_chance"] = round(candidate["good_chance"], 3)
+        candidate["name"] = f"random:{i}"
+        yield candidate
+
+
+def play_games(candidate, policy, first_seed, count):
+    """Worker: play count rounds and return their scores and misses"""
+    sim = Simulation()
+    scores = []
+    misses = []
+    for seed in range(first_seed, first_seed + count):
+        sim.reset(seed=seed)
+        sim.spawn_rate = candidate["spawn_rate"]
+        sim.speed_range = (candidate["speed_min"], candidate["speed_min"] + candidate["speed_span"])
+        sim.good_chance = candidate["good_chance"]
+        result = sim.run(make_policy(policy, seed), record_events=False)
+        scores.append(result.score)
+        misses.append(result.misses)
+    return scores, misses
+
+
+def load_checkpoint(path, config):
+    """Return the completed jobs stored in a checkpoint file"""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path) as f:
+        lines = f.read().splitlines()
+    if not lines or json.loads(lines[0]).get("config") != config:
+        sys.exit(f"Checkpoint {path} was written for different arguments")
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # Partially written line from an interrupted run
+        done[tuple(record["job"])] = (record["scores"], record["misses"])
+    return done
+
+
+def summarize(values):
+    deciles = statistics.quantiles(values, n=10) if len(values) > 1 else values * 9
+    return {
+        "mean": round(statistics.fmean(values), 3),
+        "stdev": round(statistics.pstdev(values), 3),
+        "p10": deciles[0],
+        "p50": deciles[4],
+        "p90": deciles[8],
+    }
+
+
+def suggest(report, reference, targets):
+    """Pick the candidate closest to each preset's target miss count"""
+    suggestions = {}
+    for preset, target in targets.items():
+        best = min(report, key=lambda c: abs(c["policies"][reference]["misses"]["mean"] - target))
+        suggestions[preset] = {
+            "target_misses": target,
+            "candidate": best["name"],
+            "spawn_rate": best["spawn_rate"],
+            "speed_range": [best["speed_min"], best["speed_min"] + best["speed_span"]],
+            "good_chance": best["good_chance"],
+            "mean_misses": best["policies"][reference]["misses"]["mean"],
+            "mean_score": best["policies"][reference]["score"]["mean"],
+        }
+    return suggestions
+
+
+def parse_targets(values):
+    targets = dict(TARGETS)
+    for value in values or []:
+        preset, _, misses = value.partition("=")
+        targets[preset] = float(misses)
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune difficulty presets with headless games")
+    parser.add_argument("--search", choices=["presets", "grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=100, help="candidates for random search")
+    parser.add_argument("--games", type=int, default=200, help="rounds per candidate and policy")
+    parser.add_argument("--policies", default="follow,casual,idle",
+                        help="comma separated list of follow, casual, random, idle")
+    parser.add_argument("--reference", default="casual", help="policy the targets refer to")
+    parser.add_argument("--target", action="append", metavar="PRESET=MISSES",
+                        help="target mean misses for a preset, e.g. Hard=12")
+    parser.add_argument("--chunk", type=int, default=50, help="rounds per worker job")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", help="append completed jobs here and resume from it")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    policies = args.policies.split(",")
+    if args.reference not in policies:
+        parser.error("--reference must be one of --policies")
+    targets = parse_targets(args.target)
+
+    candidates = list(preset_candidates())
+    if args.search == "grid":
+        candidates += list(grid_candidates())
+    elif args.search == "random":
+        candidates += list(random_candidates(args.samples, args.seed))
+
+    # Every candidate plays the same seeds, which keeps comparisons fair
+    jobs = [(c, policy, first, min(args.chunk, args.games - (first - args.seed)))
+            for c in range(len(candidates))
+            for policy in policies
+            for first in range(args.seed, args.seed + args.games, args.chunk)]
+
+    config = {key: getattr(args, key) for key in ("search", "samples", "games", "policies", "chunk", "seed")}
+    done = load_checkpoint(args.checkpoint, config)
+    checkpoint = None
+    if args.checkpoint:
+        is_new = not os.path.exists(args.checkpoint)
+        checkpoint = open(args.checkpoint, "a")
+        if is_new:
+            checkpoint.write(json.dumps({"config": config}) + "\n")
+
+    pending = [job for job in jobs if job not in done]
+    print(f"{len(candidates)} candidates, {len(jobs)} jobs, {len(jobs) - len(pending)} already done",
+          file=sys.stderr)
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(play_games, candidates[job[0]], *job[1:]): job for job in pending}
+            for i, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                done[job] = future.result()
+                if checkpoint:
+                    checkpoint.write(json.dumps({"job": job, "scores": done[job][0],
+                                                 "misses": done[job][1]}) + "\n")
+                    checkpoint.flush()
+                if i % 100 == 0 or i == len(pending):
+                    print(f"{i}/{len(pending)} jobs", file=sys.stderr)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    # Collect the results per candidate and policy
+    report = []
+    for c, candidate in enumerate(candidates):
+        entry = dict(candidate, policies={})
+        for policy in policies:
+            scores = []
+            misses = []
+            for job in jobs:
+                if job[0] == c and job[1] == policy:
+                    scores += done[job][0]
+                    misses += done[job][1]
+            entry["policies"][policy] = {"score": summarize(scores), "misses": summarize(misses)}
+        report.append(entry)
+
+    for entry in report:
+        if entry["name"].startswith("preset:"):
+            for policy, stats in entry["policies"].items():
+                print(f"{entry['name']:<16} {policy:<8} score {stats['score']['mean']:>8.1f} "
+                      f"(p10 {stats['score']['p10']:.0f}, p90 {stats['score']['p90']:.0f})  "
+                      f"misses {stats['misses']['mean']:>5.2f} "
+                      f"(p10 {stats['misses']['p10']:.0f}, p90 {stats['misses']['p90']:.0f})")
+
+    suggestions = suggest(report, args.reference, targets)
+    for preset, suggestion in suggestions.items():
+        print(f"{preset}: spawn_rate={suggestion['spawn_rate']} "
+              f"speed_range={tuple(suggestion['speed_range'])} "
+              f"good_chance={suggestion['good_chance']} -> "
+              f"{suggestion['mean_misses']:.2f} misses (target {suggestion['target_misses']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": config, "targets": targets, "candidates": report,
+                       "suggestions": suggestions}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
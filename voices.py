@@ -0,0 +1,105 @@
+"""Voice manager for sound effects
+
+Effects are requested as they happen and handed to the mixer once per
+frame. Each effect gets its own group of reserved channels, so a flood of
+one sound can never take the channels of another, and the group size caps
+how many copies of it play at once. Requests for an effect that arrive
+within a short window of its last play are held and merged into a single
+louder play, so the mixer work per frame stays the same however many
+objects are caught or missed.
+"""
+import math
+import time
+
+import pygame
+
+# Effect name -> number of reserved channels (its polyphony cap)
+GROUPS = {"catch": 3, "bad_catch": 2, "miss": 2, "game_over": 1}
+
+MERGE_WINDOW = 0.06  # Seconds within which repeated requests merge
+BASE_VOLUME = 0.6  # Volume of a single play, leaving headroom for merged ones
+FREE_CHANNELS = 2  # Unreserved channels left over for music
+
+
+class VoiceManager:
+    """Queues effect requests and plays them on reserved channel groups"""
+
+    def __init__(self, groups=GROUPS, window=MERGE_WINDOW, base_volume=BASE_VOLUME):
+        self.groups = groups
+        self.window = window
+        self.base_volume = base_volume
+        self.channels = None  # Effect name -> reserved Channels, set up on first use
+        self.next_voice = {}  # Effect name -> index of the channel to use or steal next
+        self.pending = {}  # Effect name -> requests not played yet
+        self.last_play = {}  # Effect name -> time of its last play
+
+        # Counters for profiling
+        self.requested = 0
+        self.played = 0
+        self.stolen = 0  # Plays that cut off a sound still playing in the group
+
+    def reserve(self):
+        """Reserve one block of channels per effect from the mixer"""
+        total = sum(self.groups.values())
+        if pygame.mixer.get_num_channels() < total + FREE_CHANNELS:
+            pygame.mixer.set_num_channels(total + FREE_CHANNELS)
+        pygame.mixer.set_reserved(total)
+        self.channels = {}
+        first = 0
+        for name, size in self.groups.items():
+            self.channels[name] = [pygame.mixer.Channel(i) for i in range(first, first + size)]
+            self.next_voice[name] = 0
+            first += size
+
+    def queue(self, name):
+        """Request one play of an effect"""
+        self.pending[name] = self.pending.get(name, 0) + 1
+        self.requested += 1
+
+    def clear(self):
+        self.pending.clear()
+
+    def flush(self, sounds, now=None):
+        """Play what was requested since the last flush
+
+        Requests for an effect played less than the merge window ago stay
+        queued and are merged into its next play.
+        """
+        if not self.pending:
+            return
+        if not sounds or not pygame.mixer.get_init():
+            self.pending.clear()  # No audio (yet); drop requests rather than pile them up
+            return
+        if self.channels is None:
+            self.reserve()
+        if now is None:
+            now = time.perf_counter()
+
+        for name, count in list(self.pending.items()):
+            if name not in sounds or name not in self.channels:
+                del self.pending[name]
+                continue
+            if now - self.last_play.get(name, -self.window) < self.window:
+                continue
+            del self.pending[name]
+            self.last_play[name] = now
+            self.play(name, sounds[name], count)
+
+    def play(self, name, sound, count):
+        """Play one voice standing for count requests"""
+        group = self.channels[name]
+        channel = None
+        for candidate in group:
+            if not candidate.get_busy():
+                channel = candidate
+                break
+        if channel is None:
+            # Every voice is busy: steal the one that started longest ago
+            channel = group[self.next_voice[name]]
+            self.stolen += 1
+        self.next_voice[name] = (group.index(channel) + 1) % len(group)
+
+        # Uncorrelated copies of a sound add up to about sqrt(n) times louder
+        channel.play(sound)
+        channel.set_volume(min(1.0, self.base_volume * math.sqrt(count)))
+        self.played += 1
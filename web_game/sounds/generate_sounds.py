@@ -1,121 +1,110 @@
-import wave
-import struct
-import math
+"""Generate the web game's sound effects and background music
+
+Music tracks are declarative descriptions (melody notes and tempo, bass
+pattern, envelope) rendered by synth in fixed-size chunks that are
+streamed straight into the WAV file, so tracks of any length use the same
+memory. Tracks are rendered in parallel over a process pool.
+
+    python generate_sounds.py --duration 180 --tracks variants.json
+"""
+import argparse
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# synth.py lives at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import synth
+
+SOUND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Sound effects: name -> (frequency, duration, volume)
+EFFECTS = {
+    "catch": (600, 0.15, 0.8),
+    "miss": (200, 0.2, 0.5),
+    "bad_catch": (300, 0.3, 0.7),
+    "bomb": (100, 0.4, 0.9),
+    "game_over": (150, 1.0, 0.8),
+}
+
+# Background music tracks with different characteristics
+MUSIC = {
+    # C4 to C5, octave down occasionally, C2 bass with variations
+    "music1": {
+        "melody": {"notes": [261.63, 293.66, 329.63, 349.23, 392.00, 440.00, 493.88, 523.25],
+                   "notes_per_second": 2, "octave_drop_rate": 4},
+        "bass": {"frequency": 65.41, "steps_per_second": 0.5, "steps": 3},
+        "envelope": {"fade": 2.0},
+    },
+    # Music 2 - different notes, A4 to A5
+    "music2": {
+        "melody": {"notes": [440.00, 493.88, 523.25, 587.33, 659.25, 698.46, 783.99, 880.00],
+                   "notes_per_second": 1.5},
+        "bass": {"frequency": 110.00, "steps_per_second": 0.7, "steps": 3},
+        "envelope": {"fade": 2.0},
+    },
+    # Music 3 - different rhythm, C4, E4, G4, C5
+    "music3": {
+        "melody": {"notes": [261.63, 329.63, 392.00, 523.25], "notes_per_second": 3},
+        "bass": {"frequency": 65.41, "steps_per_second": 1, "steps": 2},
+        "envelope": {"fade": 2.0},
+    },
+}
+
 
 def create_simple_sound(filename, frequency=440, duration=0.5, volume=1.0):
     """Create a simple sine wave sound file"""
-    sample_rate = 44100
-    num_samples = int(duration * sample_rate)
-    
-    # Create sine wave
-    buf = []
-    for i in range(num_samples):
-        sample = int(32767.0 * volume * 
-                    math.sin(2 * math.pi * frequency * i / sample_rate))
-        buf.append(struct.pack('h', sample))
-    
-    # Write to file
-    with wave.open(filename, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(b''.join(buf))
-
-def create_background_music(filename, duration=10.0):
-    """Create a simple background music loop"""
-    sample_rate = 44100
-    
-    # Create a simple melody
-    notes = [261.63, 293.66, 329.63, 349.23, 392.00, 440.00, 493.88, 523.25]  # C4 to C5
-    
-    # Generate the audio data
-    audio_data = []
-    for i in range(int(duration * sample_rate)):
-        t = i / sample_rate
-        
-        # Create a simple melody by selecting different notes over time
-        note_idx = int((t * 2) % len(notes))
-        freq = notes[note_idx]
-        
-        # Add some variation
-        if int(t * 4) % 4 == 0:
-            freq *= 0.5  # Octave down occasionally
-        
-        # Generate the sample
-        sample = int(10000 * math.sin(2 * math.pi * freq * t))
-        
-        # Add a simple bass line
-        bass_freq = 65.41 * (1 + int(t * 0.5) % 3)  # C2 with variations
-        sample += int(5000 * math.sin(2 * math.pi * bass_freq * t))
-        
-        # Apply envelope to avoid clicks
-        envelope = min(1.0, (duration - t) / 2.0, t / 2.0)
-        sample = int(sample * envelope)
-        
-        # Pack the sample
-        audio_data.append(struct.pack('h', sample))
-    
-    # Write to file
-    with wave.open(filename, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(b''.join(audio_data))
-
-# Create directory if it doesn't exist
-os.makedirs(os.path.dirname(os.path.abspath(__file__)), exist_ok=True)
-
-# Create sound effects
-create_simple_sound("catch.wav", frequency=600, duration=0.15, volume=0.8)
-create_simple_sound("miss.wav", frequency=200, duration=0.2, volume=0.5)
-create_simple_sound("bad_catch.wav", frequency=300, duration=0.3, volume=0.7)
-create_simple_sound("bomb.wav", frequency=100, duration=0.4, volume=0.9)
-create_simple_sound("game_over.wav", frequency=150, duration=1.0, volume=0.8)
-
-# Create background music tracks with different characteristics
-create_background_music("music1.wav", duration=10.0)
-
-# Music 2 - different notes
-notes2 = [440.00, 493.88, 523.25, 587.33, 659.25, 698.46, 783.99, 880.00]  # A4 to A5
-sample_rate = 44100
-duration = 10.0
-audio_data = []
-for i in range(int(duration * sample_rate)):
-    t = i / sample_rate
-    note_idx = int((t * 1.5) % len(notes2))
-    freq = notes2[note_idx]
-    sample = int(10000 * math.sin(2 * math.pi * freq * t))
-    bass_freq = 110.00 * (1 + int(t * 0.7) % 3)
-    sample += int(5000 * math.sin(2 * math.pi * bass_freq * t))
-    envelope = min(1.0, (duration - t) / 2.0, t / 2.0)
-    sample = int(sample * envelope)
-    audio_data.append(struct.pack('h', sample))
-with wave.open("music2.wav", 'wb') as wf:
-    wf.setnchannels(1)
-    wf.setsampwidth(2)
-    wf.setframerate(sample_rate)
-    wf.writeframes(b''.join(audio_data))
-
-# Music 3 - different rhythm
-notes3 = [261.63, 329.63, 392.00, 523.25]  # C4, E4, G4, C5
-sample_rate = 44100
-duration = 10.0
-audio_data = []
-for i in range(int(duration * sample_rate)):
-    t = i / sample_rate
-    note_idx = int((t * 3) % len(notes3))
-    freq = notes3[note_idx]
-    sample = int(10000 * math.sin(2 * math.pi * freq * t))
-    bass_freq = 65.41 * (1 + int(t) % 2)
-    sample += int(5000 * math.sin(2 * math.pi * bass_freq * t))
-    envelope = min(1.0, (duration - t) / 2.0, t / 2.0)
-    sample = int(sample * envelope)
-    audio_data.append(struct.pack('h', sample))
-with wave.open("music3.wav", 'wb') as wf:
-    wf.setnchannels(1)
-    wf.setsampwidth(2)
-    wf.setframerate(sample_rate)
-    wf.writeframes(b''.join(audio_data))
-
-print("Sound files generated successfully!")
+    synth.write_wav(filename, synth.tone(frequency, duration, volume))
+
+
+def create_background_music(filename, duration=10.0, track=None, chunk_samples=synth.CHUNK_SAMPLES):
+    """Stream a music track into a WAV file chunk by chunk"""
+    if track is None:
+        track = MUSIC["music1"]
+    synth.write_wav_chunks(filename, synth.render_chunks(track, duration, chunk_samples))
+    return filename
+
+
+def generate_all(sound_dir=SOUND_DIR, duration=10.0, tracks=MUSIC, workers=1):
+    """Generate every sound effect and music track
+
+    With more than one worker the music tracks are rendered in parallel
+    processes.
+    """
+    os.makedirs(sound_dir, exist_ok=True)
+
+    # Create sound effects
+    for name, (frequency, length, volume) in EFFECTS.items():
+        create_simple_sound(os.path.join(sound_dir, name + ".wav"), frequency, length, volume)
+
+    # Create background music tracks
+    jobs = [(os.path.join(sound_dir, name + ".wav"), duration, track) for name, track in tracks.items()]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+            list(pool.map(create_background_music, *zip(*jobs)))
+    else:
+        for job in jobs:
+            create_background_music(*job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the web game's sounds and music")
+    parser.add_argument("--output", default=SOUND_DIR, help="directory to write the WAV files to")
+    parser.add_argument("--duration", type=float, default=10.0, help="music length in seconds")
+    parser.add_argument("--tracks", metavar="JSON",
+                        help="file of name -> track description to render instead of the built-in music")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes rendering music tracks")
+    args = parser.parse_args()
+
+    tracks = MUSIC
+    if args.tracks:
+        with open(args.tracks) as f:
+            tracks = json.load(f)
+    generate_all(args.output, args.duration, tracks, args.workers)
+    print("Sound files generated successfully!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Retained-mode UI widgets driven by mouse events
+
+Widgets keep their own hover, pressed and selected state and only change
+it when handle_event() sees a mouse event for them. A click is a button
+press and release on the same widget, so holding the button down never
+clicks twice. Drawing only touches widgets whose state changed since they
+were last drawn.
+"""
+import pygame
+
+
+class Button:
+    """A rounded button with a centred label"""
+
+    def __init__(self, rect, text, on_click, selected=False):
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.on_click = on_click
+        self.selected = selected
+        self.hovered = False
+        self.dirty = True
+
+    def set(self, **state):
+        """Change hover or selection state, marking the button for redraw if it differs"""
+        for name, value in state.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                self.dirty = True
+
+    def color(self, style):
+        if self.hovered and not self.selected:  # Selected buttons do not light up under the mouse
+            return style.BUTTON_HOVER_COLOR
+        if self.selected:
+            return style.BUTTON_SELECTED_COLOR
+        return style.BUTTON_COLOR
+
+    def draw(self, surface, font, text_cache, style):
+        pygame.draw.rect(surface, self.color(style), self.rect, 0, 10)
+        text_surf = text_cache.render(font, self.text, True, (255, 255, 255))
+        surface.blit(text_surf, text_surf.get_rect(center=self.rect.center))
+        self.dirty = False
+        return self.rect
+
+
+class WidgetLayer:
+    """The widgets of one screen, with event dispatch and dirty drawing"""
+
+    def __init__(self, widgets=()):
+        self.widgets = list(widgets)
+        self.pressed = None  # Widget the mouse button went down on
+
+    def widget_at(self, pos):
+        for widget in self.widgets:
+            if widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def hover(self, pos):
+        """Update hover state for a mouse position"""
+        for widget in self.widgets:
+            widget.set(hovered=widget.rect.collidepoint(pos))
+
+    def handle_event(self, event):
+        """Apply a mouse event; returns True if it clicked a widget"""
+        if event.type == pygame.MOUSEMOTION:
+            self.hover(event.pos)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.pressed = self.widget_at(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            widget = self.widget_at(event.pos)
+            pressed, self.pressed = self.pressed, None
+            if widget is not None and widget is pressed:
+                widget.on_click()
+                return True
+        return False
+
+    def invalidate(self):
+        for widget in self.widgets:
+            widget.dirty = True
+
+    def draw(self, surface, background, font, text_cache, style):
+        """Redraw widgets whose state changed; returns the rects drawn"""
+        rects = []
+        for widget in self.widgets:
+            if widget.dirty:
+                surface.blit(background, widget.rect, widget.rect)
+                rects.append(widget.draw(surface, font, text_cache, style))
+        return rects